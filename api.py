@@ -1,29 +1,98 @@
-from fastapi import FastAPI, HTTPException
+import time
+_MODULE_START = time.perf_counter()
+
+# Heavy modules (pandas, numpy, xgboost, joblib) are imported lazily in
+# load_model() and the request path so the process starts fast.
+import os
+import re
+import threading
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import joblib
-import pandas as pd
-import numpy as np
-from typing import Dict, Any
-import uvicorn
-from datetime import datetime
+from typing import Dict, Any, List
+
+# Decision threshold on the fraud probability
+FRAUD_THRESHOLD = 0.2
+
+# Upper bound on rows accepted by a single /predict/batch call
+MAX_BATCH_SIZE = 1000
+
+# Upper bound on rows accepted by a single /predict/columnar call (no per-row objects)
+MAX_COLUMNAR_BATCH_SIZE = 100_000
+
+# Column schema of a transaction batch (TransactionData fields; also checked on
+# /predict/columnar payloads, see src/utils/columnar.py)
+TRANSACTION_COLUMNS = {
+    "user_id": "integer",
+    "signup_time": "timestamp",
+    "purchase_time": "timestamp",
+    "purchase_value": "number",
+    "device_id": "string",
+    "source": "string",
+    "browser": "string",
+    "sex": "string",
+    "age": "integer",
+    "ip_address": "string",
+    "transaction_country": "string",
+}
+OPTIONAL_TRANSACTION_COLUMNS = {"Amount": "number", "Time": "number"}
+
+# Model locations: the compact artifact (see src/models/artifact.py) is
+# preferred, the joblib pickles are the fallback and are also served when
+# they are newer than the artifact (retrained but not re-exported)
+ARTIFACT_PATH = os.environ.get("FRAUD_MODEL_ARTIFACT", "models/ecommerce_model.npz")
+PIPELINE_PATH = os.environ.get("FRAUD_MODEL_PIPELINE", "models/XGBoost_ecommerce_pipeline.pkl")
+MODEL_INFO_PATH = os.environ.get("FRAUD_MODEL_INFO", "models/ecommerce_model_info.pkl")
+
+# Reference profile written by src/models/Train.py for drift monitoring
+DRIFT_PROFILE_PATH = os.environ.get("FRAUD_DRIFT_PROFILE", "models/reference_profile.json")
+
+# Count-min frequency sketches written by src/models/Train.py
+FREQUENCY_SKETCH_PATH = os.environ.get("FRAUD_FREQUENCY_SKETCHES", "models/frequency_sketches.npz")
+
+# Two-stage cascade for the served model, written by src/models/build_cascade.py
+# (set FRAUD_CASCADE=0 to disable). Stage-1 probabilities are recalibrated onto
+# the full model's scale when the cascade is built.
+# FRAUD_CASCADE_BAND="low,high" overrides the calibrated uncertainty band.
+CASCADE_PATH = os.environ.get("FRAUD_CASCADE_PATH", "models/cascade.json")
+CASCADE_ENABLED = os.environ.get("FRAUD_CASCADE", "1") != "0"
+CASCADE_BAND = os.environ.get("FRAUD_CASCADE_BAND")
+
+# Audit log of every scoring decision (set FRAUD_AUDIT_DIR="" to disable)
+AUDIT_LOG_DIR = os.environ.get("FRAUD_AUDIT_DIR", "logs/audit")
+
+# Populated by load_model()
+pipeline = None
+model_info = None
+model_version = None
+drift_monitor = None
+frequency_encoder = None
+cascade = None
+stage_counts = {"fast": 0, "full": 0}
+stage_counts_lock = threading.Lock()  # /predict/batch runs in the threadpool
+
+# Started per serving process by the lifespan hook: writer threads do not survive fork
+audit_logger = None
+model_ready = False
+startup_timings: Dict[str, float] = {}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # No-op when a launcher (serve.py) already loaded the model before forking
+    load_model()
+    start_audit_log()
+    yield
+    stop_audit_log()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="E-Commerce Fraud Detection API",
     description="API for detecting fraud in E-Commerce transactions",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Load the E-commerce model pipeline and info
-try:
-    pipeline = joblib.load("models/XGBoost_ecommerce_pipeline.pkl")
-    model_info = joblib.load("models/ecommerce_model_info.pkl")
-    print("✅ E-commerce model loaded successfully!")
-except Exception as e:
-    print(f"❌ Error loading E-commerce model: {e}")
-    pipeline = None
-    model_info = None
-
 # Pydantic model for request validation
 class TransactionData(BaseModel):
     user_id: int
@@ -45,85 +114,508 @@ class PredictionResponse(BaseModel):
     fraud_probability: float
     fraud_label: int
     confidence: float
+    stage: str = "full"  # "fast" when the cascade's first stage answered
 
-def preprocess_transaction(transaction: TransactionData, encoders: Dict, feature_columns: list):
+# Pydantic models for batch scoring
+class BatchTransactionData(BaseModel):
+    transactions: List[TransactionData]
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
+
+def load_model(warm: bool = True) -> bool:
     """
-    Preprocess a single transaction for prediction
+    Load the E-commerce model pipeline and info once, then warm it up.
+    Timings for each startup phase are recorded in startup_timings.
     """
-    # Convert datetime strings to datetime objects
-    signup_time = pd.to_datetime(transaction.signup_time)
-    purchase_time = pd.to_datetime(transaction.purchase_time)
-    
+    global pipeline, model_info, model_version, model_ready, drift_monitor, frequency_encoder, cascade
+
+    if pipeline is not None:
+        return model_ready
+
+    try:
+        t0 = time.perf_counter()
+        import numpy  # noqa: F401
+        import pandas  # noqa: F401
+        use_artifact = os.path.exists(ARTIFACT_PATH)
+        if use_artifact and os.path.exists(PIPELINE_PATH) \
+                and os.path.getmtime(PIPELINE_PATH) > os.path.getmtime(ARTIFACT_PATH):
+            print(f"⚠️  {PIPELINE_PATH} is newer than {ARTIFACT_PATH}: serving the pickle. "
+                  f"Re-export the artifact with: python -m src.models.artifact")
+            use_artifact = False
+        if use_artifact:
+            import xgboost  # noqa: F401
+            from src.models.artifact import load_artifact
+        else:
+            import joblib
+        t1 = time.perf_counter()
+
+        if use_artifact:
+            pipeline, model_info = load_artifact(ARTIFACT_PATH)
+        else:
+            pipeline = joblib.load(PIPELINE_PATH)
+            model_info = joblib.load(MODEL_INFO_PATH)
+        t2 = time.perf_counter()
+
+        model_path = ARTIFACT_PATH if use_artifact else PIPELINE_PATH
+        model_version = os.environ.get("FRAUD_MODEL_VERSION") or \
+            f"{os.path.basename(model_path)}@{int(os.path.getmtime(model_path))}"
+
+        startup_timings.update({
+            "module_import_s": t0 - _MODULE_START,
+            "import_s": t1 - t0,
+            "load_s": t2 - t1,
+        })
+        print(f"✅ E-commerce model loaded successfully from {ARTIFACT_PATH if use_artifact else PIPELINE_PATH}")
+    except Exception as e:
+        print(f"❌ Error loading E-commerce model: {e}")
+        pipeline = None
+        model_info = None
+        return False
+
+    if os.path.exists(FREQUENCY_SKETCH_PATH):
+        try:
+            from src.features.frequency_sketch import FrequencySketchEncoder
+            frequency_encoder = FrequencySketchEncoder.load(FREQUENCY_SKETCH_PATH)
+            print(f"✅ Frequency sketches loaded for {frequency_encoder.columns}")
+        except Exception as e:
+            print(f"⚠️  Frequency sketches disabled: {e}")
+
+    if CASCADE_ENABLED and os.path.exists(CASCADE_PATH):
+        try:
+            from src.models.cascade import CascadeModel, validate_band
+            candidate = CascadeModel.load(CASCADE_PATH)
+            if candidate.feature_columns != list(model_info['feature_columns']):
+                raise ValueError("first-stage features do not match the served model")
+            if CASCADE_BAND:
+                try:
+                    candidate.low, candidate.high = (float(v) for v in CASCADE_BAND.split(","))
+                except ValueError:
+                    raise ValueError(f"FRAUD_CASCADE_BAND must be 'low,high', got {CASCADE_BAND!r}")
+            validate_band(candidate.low, candidate.high, FRAUD_THRESHOLD)
+            cascade = candidate
+            print(f"✅ Cascade enabled: band [{cascade.low:.4f}, {cascade.high:.4f})")
+        except Exception as e:
+            print(f"⚠️  Cascade disabled: {e}")
+
+    if os.path.exists(DRIFT_PROFILE_PATH):
+        try:
+            from src.monitoring.drift import DriftMonitor
+            # Served scores are compared against the cascade's own output
+            # distribution while it answers; a hand-set band has no reference
+            score_reference = "score" if cascade is None else (None if CASCADE_BAND else "cascade_score")
+            drift_monitor = DriftMonitor.from_file(DRIFT_PROFILE_PATH, score_reference=score_reference)
+            if cascade is not None and drift_monitor.score_reference is None:
+                print("⚠️  Score drift disabled: no cascade score reference for the served band")
+            print(f"✅ Drift monitor tracking {len(drift_monitor.numeric) + len(drift_monitor.categorical)} feature(s)")
+        except Exception as e:
+            print(f"⚠️  Drift monitor disabled: {e}")
+
+    if warm:
+        warm_up()
+    else:
+        model_ready = True
+    return model_ready
+
+def warm_up() -> None:
+    """
+    Run one synthetic transaction through preprocessing and predict_proba so
+    lazy imports, encoder lookups and booster caches are paid before readiness
+    """
+    global model_ready
+
+    t0 = time.perf_counter()
+    encoders = model_info['encoders']
+    sample = TransactionData(
+        user_id=0,
+        signup_time="2015-01-01 00:00:00",
+        purchase_time="2015-01-01 01:00:00",
+        purchase_value=0.0,
+        device_id="WARMUP",
+        source=str(encoders['source'].classes_[0]),
+        browser=str(encoders['browser'].classes_[0]),
+        sex=str(encoders['sex'].classes_[0]),
+        age=30,
+        ip_address="0.0.0.0",
+        transaction_country=str(encoders['country'].classes_[0])
+    )
+    try:
+        X = preprocess_transactions([sample], encoders, model_info['feature_columns'], update_counts=False)
+        pipeline.predict_proba(X)
+    except Exception as e:
+        print(f"⚠️  Warm-up prediction failed: {e}")
+    startup_timings["warmup_s"] = time.perf_counter() - t0
+    startup_timings["time_to_ready_s"] = time.perf_counter() - _MODULE_START
+    model_ready = True
+    print("🔥 Model warm-up done: " + ", ".join(f"{k}={v:.3f}" for k, v in startup_timings.items()))
+
+def share_across_workers() -> None:
+    """
+    Move online state (drift histograms, frequency sketches) into memory
+    shared with worker processes forked afterwards. Called by serve.py in the parent.
+    """
+    if drift_monitor is not None:
+        drift_monitor.share()
+    if frequency_encoder is not None:
+        frequency_encoder.share()
+
+def start_audit_log() -> None:
+    """
+    Start the background audit writer for this process
+    """
+    global audit_logger
+
+    if audit_logger is not None or not AUDIT_LOG_DIR or model_info is None:
+        return
+    try:
+        from src.monitoring.audit import AuditLogger
+        audit_logger = AuditLogger(AUDIT_LOG_DIR, model_info['feature_columns'], model_version)
+        print(f"✅ Audit log writing to {AUDIT_LOG_DIR}")
+    except Exception as e:
+        print(f"⚠️  Audit log disabled: {e}")
+
+def stop_audit_log() -> None:
+    """
+    Flush queued audit records and close the current file
+    """
+    global audit_logger
+
+    if audit_logger is not None:
+        audit_logger.close()
+        print(f"✅ Audit log flushed: {audit_logger.stats()}")
+        audit_logger = None
+
+# Timestamps with an explicit UTC offset ("...T10:00:00+02:00", "...Z")
+TIMESTAMP_ZONE_PATTERN = r"^(?P<local>.*\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)\s*(?P<zone>Z|[+-]\d{2}(?::?\d{2})?)$"
+TIMESTAMP_ZONE_RE = re.compile(TIMESTAMP_ZONE_PATTERN)
+
+# Batches up to this size are parsed value by value: the vectorized pandas
+# path has a fixed cost of a few ms that dominates single-row /predict
+SCALAR_BATCH_SIZE = 16
+
+def zone_minutes(zone: str) -> int:
+    """
+    UTC offset in minutes of a TIMESTAMP_ZONE_PATTERN zone ("Z", "+02", "-0530", "+05:30")
+    """
+    if zone == "Z":
+        return 0
+    digits = zone[1:].replace(":", "").ljust(4, "0")
+    return (-1 if zone[0] == "-" else 1) * (int(digits[:2]) * 60 + int(digits[2:]))
+
+def parse_timestamps(values):
+    """
+    Timestamp parsing with the semantics of a per-value pd.to_datetime():
+    hour/day/... features use the wall-clock time as written, differences
+    are taken between the absolute instants.
+    Returns (wall-clock datetimes, UTC offsets in minutes). The datetimes are
+    a list of Timestamps for small batches, a datetime Series otherwise.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if len(values) <= SCALAR_BATCH_SIZE:
+        local, offset = [], []
+        for value in values:
+            text = str(value)
+            match = TIMESTAMP_ZONE_RE.match(text)
+            ts = pd.Timestamp(match["local"] if match else text)
+            if ts.tz is not None:
+                raise ValueError("Unsupported timestamp time zone; use a numeric UTC offset")
+            local.append(ts)
+            offset.append(zone_minutes(match["zone"]) if match else 0)
+        return local, np.array(offset, dtype=np.int64)
+
+    values = pd.Series(values, dtype=object).astype(str)
+    parts = values.str.extract(TIMESTAMP_ZONE_PATTERN)
+    local = parts["local"].fillna(values)
+    try:
+        local = pd.to_datetime(local, format="ISO8601")
+    except ValueError:
+        local = pd.to_datetime(local, format="mixed")
+    if getattr(local.dt, "tz", None) is not None:
+        raise ValueError("Unsupported timestamp time zone; use a numeric UTC offset")
+
+    zone = parts["zone"].fillna("Z").replace("Z", "+00:00").str.replace(":", "", regex=False).str.ljust(5, "0")
+    sign = np.where(zone.str[0] == "-", -1, 1)
+    offset = sign * (zone.str[1:3].astype(int).to_numpy() * 60 + zone.str[3:5].astype(int).to_numpy())
+    return local, offset
+
+def time_features(signup_time, signup_offset, purchase_time, purchase_offset) -> Dict[str, Any]:
+    """
+    Time-based feature columns from wall-clock datetimes and UTC offsets in
+    minutes (see parse_timestamps)
+    """
+    import numpy as np
+
+    features = {}
+    if isinstance(signup_time, list):
+        # Few rows: Timestamp attributes, no per-call .dt accessor overhead
+        for prefix, ts in (('signup', signup_time), ('purchase', purchase_time)):
+            features[f'{prefix}_hour'] = np.array([t.hour for t in ts], dtype=np.int64)
+            features[f'{prefix}_day'] = np.array([t.day for t in ts], dtype=np.int64)
+            features[f'{prefix}_month'] = np.array([t.month for t in ts], dtype=np.int64)
+            features[f'{prefix}_weekday'] = np.array([t.weekday() for t in ts], dtype=np.int64)
+        seconds = np.array([(p - s).total_seconds() for s, p in zip(signup_time, purchase_time)], dtype=np.float64)
+    else:
+        for prefix, ts in (('signup', signup_time), ('purchase', purchase_time)):
+            features[f'{prefix}_hour'] = ts.dt.hour.to_numpy()
+            features[f'{prefix}_day'] = ts.dt.day.to_numpy()
+            features[f'{prefix}_month'] = ts.dt.month.to_numpy()
+            features[f'{prefix}_weekday'] = ts.dt.weekday.to_numpy()
+        seconds = (purchase_time - signup_time).dt.total_seconds().to_numpy()
+
+    # Time difference between signup and purchase, in absolute time
+    features['time_to_purchase'] = seconds - (purchase_offset - signup_offset) * 60.0
+    return features
+
+def transaction_columns(transactions: List[TransactionData]) -> Dict[str, list]:
+    """
+    Transpose validated transactions into one list per field
+    """
+    return {name: [getattr(t, name) for t in transactions]
+            for name in (*TRANSACTION_COLUMNS, *OPTIONAL_TRANSACTION_COLUMNS)}
+
+def batch_features(columns: Dict[str, Any], encoders: Dict, update_counts: bool = True) -> Dict[str, Any]:
+    """
+    Build the raw feature columns for a batch of transactions, one vectorized
+    operation per feature. With update_counts, the frequency sketches count
+    each row before its `<col>_freq` features are read, as if the rows had
+    arrived one at a time (as in training, where each row counts towards its
+    own frequency).
+    """
+    import numpy as np
+
+    signup_time, signup_offset = parse_timestamps(columns['signup_time'])
+    purchase_time, purchase_offset = parse_timestamps(columns['purchase_time'])
+
+    features = {
+        'user_id': np.asarray(columns['user_id'], dtype=np.int64),
+        'purchase_value': np.asarray(columns['purchase_value'], dtype=np.float64),
+        'age': np.asarray(columns['age'], dtype=np.int64),
+    }
+
     # Extract time-based features
-    signup_hour = signup_time.hour
-    signup_day = signup_time.day
-    signup_month = signup_time.month
-    signup_weekday = signup_time.weekday()
-    
-    purchase_hour = purchase_time.hour
-    purchase_day = purchase_time.day
-    purchase_month = purchase_time.month
-    purchase_weekday = purchase_time.weekday()
-    
-    # Time difference between signup and purchase
-    time_to_purchase = (purchase_time - signup_time).total_seconds()
-    
+    features.update(time_features(signup_time, signup_offset, purchase_time, purchase_offset))
+
     # Encode categorical variables
-    source_encoded = encoders['source'].transform([transaction.source])[0]
-    browser_encoded = encoders['browser'].transform([transaction.browser])[0]
-    sex_encoded = encoders['sex'].transform([transaction.sex])[0]
-    
-    # Create device_id features
-    device_id_length = len(transaction.device_id)
-    device_id_unique_chars = len(set(transaction.device_id))
-    
-    # IP address features
-    ip_address_length = len(str(transaction.ip_address))
-    
-    # Transaction country features
-    country_encoded = encoders['country'].transform([transaction.transaction_country])[0]
-    
-    # Create feature vector
+    features['source_encoded'] = np.asarray(encoders['source'].transform(columns['source']))
+    features['browser_encoded'] = np.asarray(encoders['browser'].transform(columns['browser']))
+    features['sex_encoded'] = np.asarray(encoders['sex'].transform(columns['sex']))
+    features['country_encoded'] = np.asarray(encoders['country'].transform(columns['transaction_country']))
+
+    # Device id and IP address features
+    features['device_id_length'] = np.array([len(d) for d in columns['device_id']], dtype=np.int64)
+    features['device_id_unique_chars'] = np.array([len(set(d)) for d in columns['device_id']], dtype=np.int64)
+    features['ip_address_length'] = np.array([len(str(ip)) for ip in columns['ip_address']], dtype=np.int64)
+
+    # Banking features only count when provided (positive)
+    for name in OPTIONAL_TRANSACTION_COLUMNS:
+        if name in columns:
+            values = np.asarray(columns[name], dtype=np.float64)
+            features[name] = np.where(values > 0, values, 0.0)
+
+    # Approximate frequency features from the count-min sketches
+    if frequency_encoder is not None:
+        values = {c: columns[c] for c in ('device_id', 'browser', 'source', 'ip_address')}
+        if update_counts:
+            features.update(frequency_encoder.update_and_query_columns(values))
+        else:
+            features.update(frequency_encoder.query_columns(values))
+
+    return features
+
+def transaction_features(transaction: TransactionData, encoders: Dict, update_counts: bool = True) -> Dict[str, Any]:
+    """
+    Build the raw feature dict for a single transaction
+    """
+    features = batch_features(transaction_columns([transaction]), encoders, update_counts)
+    return {name: values[0] for name, values in features.items()}
+
+def preprocess_transactions(transactions: List[TransactionData], encoders: Dict, feature_columns: list,
+                            update_counts: bool = True):
+    """
+    Preprocess a list of transactions into one feature matrix
+    """
+    features = batch_features(transaction_columns(transactions), encoders, update_counts)
+    return features_to_matrix(features, feature_columns)
+
+def features_to_matrix(features: Dict[str, Any], feature_columns: list):
+    """
+    Arrange feature columns into the model's feature matrix
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(features)
+
+    # Missing features default to 0, columns are reordered to match training data
+    X = df.reindex(columns=feature_columns, fill_value=0).fillna(0)
+
+    return X
+
+def preprocess_transaction(transaction: TransactionData, encoders: Dict, feature_columns: list):
+    """
+    Preprocess a single transaction for prediction
+    """
+    return preprocess_transactions([transaction], encoders, feature_columns)
+
+def encode_column(encoder, column, name: str):
+    """
+    Vectorized LabelEncoder.transform for a pyarrow string column
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from src.utils.columnar import ColumnarPayloadError, as_string_array
+
+    column = as_string_array(column)
+    classes = [str(c) for c in encoder.classes_]
+    codes = pc.index_in(column, value_set=pa.array(classes, type=pa.string()))
+    if codes.null_count:
+        unseen = pc.unique(column.filter(pc.is_null(codes))).to_pylist()[:5]
+        raise ColumnarPayloadError(f"{name}: unseen label(s) {unseen}")
+    # LabelEncoder classes_ are sorted, so the position is the encoded value
+    return codes.to_numpy()
+
+def columnar_timestamps(column):
+    """
+    (wall-clock datetimes, UTC offsets in minutes) for a pyarrow timestamp or
+    string column, with the semantics of parse_timestamps(). Strings without
+    a zone offset are cast by Arrow; anything else goes through the same
+    parser as the JSON endpoints, so both accept and reject the same values.
+    """
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from src.utils.columnar import ColumnarPayloadError, as_string_array
+
+    array = column.combine_chunks()
+    if pa.types.is_timestamp(array.type):
+        array = array.cast(pa.timestamp("us", tz=array.type.tz))
+        if array.type.tz is None:
+            return pd.Series(array.to_numpy()), np.zeros(len(array), dtype=np.int64)
+        # Zone-aware column: features use the local time in that zone
+        utc = array.cast(pa.int64()).to_numpy()
+        local = pc.local_timestamp(array)
+        offset = (local.cast(pa.int64()).to_numpy() - utc) // 60_000_000
+        return pd.Series(local.to_numpy()), offset
+
+    strings = as_string_array(array)
+    if not pc.any(pc.match_substring_regex(strings, TIMESTAMP_ZONE_PATTERN)).as_py():
+        try:
+            local = pc.cast(strings, pa.timestamp("us"))
+            return pd.Series(local.to_numpy(zero_copy_only=False)), np.zeros(len(strings), dtype=np.int64)
+        except pa.ArrowInvalid:
+            pass
+    try:
+        return parse_timestamps(strings.to_pandas())
+    except (ValueError, TypeError) as e:
+        raise ColumnarPayloadError(f"Unparseable timestamp: {e}") from None
+
+def columnar_features(table, encoders: Dict):
+    """
+    Feature columns for a validated pyarrow Table, computed column-wise with the
+    same definitions as transaction_features(); frequency sketches are updated
+    as if the rows had arrived one at a time
+    """
+    import numpy as np
+    import pyarrow.compute as pc
+    from src.utils.columnar import as_string_array, unique_char_counts
+
+    def numbers(name, dtype=np.float64):
+        return table.column(name).combine_chunks().to_numpy().astype(dtype, copy=False)
+
+    device_id = as_string_array(table.column("device_id"))
+
     features = {
-        'user_id': transaction.user_id,
-        'purchase_value': transaction.purchase_value,
-        'age': transaction.age,
-        'signup_hour': signup_hour,
-        'signup_day': signup_day,
-        'signup_month': signup_month,
-        'signup_weekday': signup_weekday,
-        'purchase_hour': purchase_hour,
-        'purchase_day': purchase_day,
-        'purchase_month': purchase_month,
-        'purchase_weekday': purchase_weekday,
-        'time_to_purchase': time_to_purchase,
-        'source_encoded': source_encoded,
-        'browser_encoded': browser_encoded,
-        'sex_encoded': sex_encoded,
-        'device_id_length': device_id_length,
-        'device_id_unique_chars': device_id_unique_chars,
-        'ip_address_length': ip_address_length,
-        'country_encoded': country_encoded
+        'user_id': numbers('user_id', np.int64),
+        'purchase_value': numbers('purchase_value'),
+        'age': numbers('age', np.int64),
     }
-    
-    # Add banking features if provided
-    if transaction.Amount > 0:
-        features['Amount'] = transaction.Amount
-    if transaction.Time > 0:
-        features['Time'] = transaction.Time
-    
-    # Create DataFrame with correct column order
-    df = pd.DataFrame([features])
-    
-    # Ensure all required features are present
-    for col in feature_columns:
-        if col not in df.columns:
-            df[col] = 0  # Default value for missing features
-    
-    # Reorder columns to match training data
-    X = df[feature_columns]
-    
-    return X
+    features.update(time_features(*columnar_timestamps(table.column("signup_time")),
+                                  *columnar_timestamps(table.column("purchase_time"))))
+    features['source_encoded'] = encode_column(encoders['source'], table.column('source'), 'source')
+    features['browser_encoded'] = encode_column(encoders['browser'], table.column('browser'), 'browser')
+    features['sex_encoded'] = encode_column(encoders['sex'], table.column('sex'), 'sex')
+    features['device_id_length'] = pc.utf8_length(device_id).to_numpy()
+    features['device_id_unique_chars'] = unique_char_counts(device_id)
+    features['ip_address_length'] = pc.utf8_length(as_string_array(table.column('ip_address'))).to_numpy()
+    features['country_encoded'] = encode_column(encoders['country'], table.column('transaction_country'),
+                                                'transaction_country')
+
+    # Banking features count only when positive, as in transaction_features()
+    for name in OPTIONAL_TRANSACTION_COLUMNS:
+        if name in table.column_names:
+            values = numbers(name)
+            features[name] = np.where(values > 0, values, 0.0)
+
+    if frequency_encoder is not None:
+        features.update(frequency_encoder.update_and_query_columns(
+            {c: table.column(c).combine_chunks() for c in ('device_id', 'browser', 'source', 'ip_address')}
+        ))
+
+    return features
+
+def observe_drift(features: Dict[str, Any], columns: Dict[str, Any], fraud_probs) -> None:
+    """
+    Feed a scored batch (engineered feature columns + raw categoricals + scores)
+    to the drift monitor
+    """
+    if drift_monitor is None:
+        return
+    country = columns['transaction_country']
+    drift_monitor.observe_columns(dict(features, source=columns['source'], browser=columns['browser'],
+                                       sex=columns['sex'], country=country, transaction_country=country),
+                                  fraud_probs)
+
+def audit_decisions(X, fraud_probs, stages) -> None:
+    """
+    Queue scored rows, with the stage that answered each one, for the audit
+    log (non-blocking)
+    """
+    if audit_logger is None:
+        return
+    import numpy as np
+
+    fraud_probs = np.asarray(fraud_probs, dtype=np.float32)
+    fraud_labels = (fraud_probs >= FRAUD_THRESHOLD).astype(np.int8)
+    audit_logger.log_matrix(X.to_numpy(dtype=np.float32), fraud_probs, fraud_labels, FRAUD_THRESHOLD,
+                            stages=stages)
+
+def score_matrix(X):
+    """
+    Fraud probabilities and answering stage for each row of X. With the
+    cascade, only rows in its uncertainty band reach the full pipeline.
+    """
+    if cascade is None:
+        with stage_counts_lock:
+            stage_counts["full"] += len(X)
+        return pipeline.predict_proba(X)[:, 1], ["full"] * len(X)
+
+    fraud_probs, stages = cascade.score(
+        X.to_numpy(dtype=float),
+        lambda rows: pipeline.predict_proba(X.iloc[rows])[:, 1]
+    )
+    n_full = int((stages == "full").sum())
+    with stage_counts_lock:
+        stage_counts["full"] += n_full
+        stage_counts["fast"] += len(X) - n_full
+    return fraud_probs, stages
+
+def build_prediction(fraud_prob: float, stage: str = "full") -> PredictionResponse:
+    """
+    Turn a fraud probability into the API response
+    """
+    fraud_label = 1 if fraud_prob >= FRAUD_THRESHOLD else 0
+
+    # Calculate confidence (distance from decision boundary)
+    confidence = abs(fraud_prob - 0.5) * 2
+
+    return PredictionResponse(
+        fraud_probability=fraud_prob,
+        fraud_label=fraud_label,
+        confidence=confidence,
+        stage=stage
+    )
 
 @app.get("/")
 async def root():
@@ -135,9 +627,19 @@ async def health_check():
         "status": "healthy", 
         "model_loaded": pipeline is not None,
         "model_type": "XGBoost E-commerce",
-        "features": len(model_info['feature_columns']) if model_info else 0
+        "features": len(model_info['feature_columns']) if model_info else 0,
+        "startup_timings": startup_timings
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe: 200 only once the model is loaded and warmed up
+    """
+    if not model_ready:
+        raise HTTPException(status_code=503, detail="Model not ready")
+    return {"status": "ready", "startup_timings": startup_timings}
+
 @app.post("/predict", response_model=PredictionResponse)
 async def predict_fraud(transaction: TransactionData):
     """
@@ -148,31 +650,163 @@ async def predict_fraud(transaction: TransactionData):
     
     try:
         # Preprocess the transaction
-        X = preprocess_transaction(transaction, model_info['encoders'], model_info['feature_columns'])
+        columns = transaction_columns([transaction])
+        features = batch_features(columns, model_info['encoders'])
+        X = features_to_matrix(features, model_info['feature_columns'])
         
         # Make prediction
         #fraud_prob = pipeline.predict_proba(X)[0, 1]
         #fraud_label = 1 if fraud_prob > 0.5 else 0
 
-        # Define a custom threshold
-        FRAUD_THRESHOLD = 0.2  
-
-        fraud_prob = pipeline.predict_proba(X)[:, 1][0]
-        fraud_label = 1 if fraud_prob >= FRAUD_THRESHOLD else 0
+        fraud_probs, stages = score_matrix(X)
+        fraud_prob = fraud_probs[0]
+        observe_drift(features, columns, fraud_probs)
+        audit_decisions(X, fraud_probs, stages)
 
+        return build_prediction(float(fraud_prob), str(stages[0]))
         
-        # Calculate confidence (distance from decision boundary)
-        confidence = abs(fraud_prob - 0.5) * 2
-        
-        return PredictionResponse(
-            fraud_probability=fraud_prob,
-            fraud_label=fraud_label,
-            confidence=confidence
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+# Plain def: FastAPI runs it in its threadpool, so concurrent batches do not
+# queue behind one another on the event loop
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+def predict_fraud_batch(batch: BatchTransactionData):
+    """
+    Predict fraud probabilities for a batch of E-commerce transactions,
+    building features column by column and scoring in a single predict_proba call
+    """
+    if pipeline is None or model_info is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+
+    if len(batch.transactions) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(batch.transactions)} rows (max {MAX_BATCH_SIZE})"
         )
-        
+
+    if not batch.transactions:
+        return BatchPredictionResponse(predictions=[])
+
+    try:
+        columns = transaction_columns(batch.transactions)
+        features = batch_features(columns, model_info['encoders'])
+        X = features_to_matrix(features, model_info['feature_columns'])
+        fraud_probs, stages = score_matrix(X)
+        observe_drift(features, columns, fraud_probs)
+        audit_decisions(X, fraud_probs, stages)
+
+        return BatchPredictionResponse(
+            predictions=[build_prediction(float(p), str(s)) for p, s in zip(fraud_probs, stages)]
+        )
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+@app.post("/predict/columnar")
+async def predict_fraud_columnar(request: Request):
+    """
+    Score a columnar batch sent as an Arrow IPC stream
+    (application/vnd.apache.arrow.stream) or msgpack column arrays
+    (application/msgpack). Results come back in the same format with the
+    columns fraud_probability, fraud_label, confidence and stage.
+    """
+    if pipeline is None or model_info is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    try:
+        from src.utils import columnar
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=f"Columnar ingestion unavailable: {e}")
+    if content_type not in columnar.CONTENT_TYPES:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported content type {content_type!r}; use one of {list(columnar.CONTENT_TYPES)}"
+        )
+
+    body = await request.body()
+    # Decoding, features and scoring are CPU-bound: keep them off the event loop
+    return await run_in_threadpool(score_columnar, body, content_type)
+
+def score_columnar(body: bytes, content_type: str) -> Response:
+    """
+    Decode, validate and score a columnar payload, encoding the results in the
+    same format (the work behind /predict/columnar)
+    """
+    from src.utils import columnar
+
+    try:
+        table = columnar.read_table(body, content_type)
+        if table.num_rows > MAX_COLUMNAR_BATCH_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch too large: {table.num_rows} rows (max {MAX_COLUMNAR_BATCH_SIZE})"
+            )
+        errors = columnar.validate_table(table, TRANSACTION_COLUMNS, OPTIONAL_TRANSACTION_COLUMNS)
+        if errors:
+            raise columnar.ColumnarPayloadError(errors)
+        features = columnar_features(table, model_info['encoders']) if table.num_rows else {}
+    except columnar.ColumnarPayloadError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+
+    try:
+        if table.num_rows:
+            X = pd.DataFrame(features).reindex(columns=model_info['feature_columns'], fill_value=0)
+            fraud_probs, stages = score_matrix(X)
+            fraud_probs = np.asarray(fraud_probs, dtype=np.float64)
+            observe_drift(features, {c: table.column(c).combine_chunks()
+                                     for c in ('source', 'browser', 'sex', 'transaction_country')},
+                          fraud_probs)
+            audit_decisions(X, fraud_probs, stages)
+        else:
+            fraud_probs, stages = np.empty(0, dtype=np.float64), []
+
+        result = pa.table({
+            "fraud_probability": fraud_probs,
+            "fraud_label": (fraud_probs >= FRAUD_THRESHOLD).astype(np.int8),
+            "confidence": np.abs(fraud_probs - 0.5) * 2,
+            "stage": pa.array(np.asarray(stages, dtype=str)).dictionary_encode(),
+        })
+        return Response(content=columnar.write_table(result, content_type), media_type=content_type)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+@app.get("/drift")
+async def drift_report():
+    """
+    PSI/KS drift scores of served traffic against the training reference profile.
+    Under serve.py the histograms are shared by all workers ("shared": true);
+    top_unseen values are those seen by the answering worker (pid).
+    """
+    if drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Drift monitoring disabled: no reference profile loaded")
+    return dict(drift_monitor.report(), pid=os.getpid())
+
+@app.post("/drift/reset")
+async def drift_reset():
+    """
+    Start a new drift observation window (for all workers under serve.py)
+    """
+    if drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Drift monitoring disabled: no reference profile loaded")
+    drift_monitor.reset()
+    return {"status": "reset"}
+
+@app.get("/audit/stats")
+async def audit_stats():
+    """
+    Audit log queue, write and drop counters for this process
+    """
+    if audit_logger is None:
+        raise HTTPException(status_code=404, detail="Audit log disabled")
+    return audit_logger.stats()
+
 @app.get("/model-info")
 async def model_info_endpoint():
     """
@@ -188,10 +822,19 @@ async def model_info_endpoint():
             "n_features": len(model_info['feature_columns']),
             "best_model": model_info['best_model'],
             "best_auc": model_info['best_auc'],
-            "encoders_available": list(model_info['encoders'].keys())
+            "encoders_available": list(model_info['encoders'].keys()),
+            "cascade": {
+                "enabled": cascade is not None,
+                "band": [cascade.low, cascade.high] if cascade else None,
+                "calibration": cascade.calibration if cascade else None,
+                "stage_counts": stage_counts
+            }
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting model info: {str(e)}")
 
 if __name__ == "__main__":
+    import uvicorn
+
+    # Single process; use serve.py for multiple workers sharing one loaded model
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -1,15 +1,111 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import io
 import json
+import pandas as pd
 
 # ========================
 # CONFIG
 # ========================
 API_URL = "http://127.0.0.1:8000/predict"  # FastAPI endpoint
+BATCH_API_URL = "http://127.0.0.1:8000/predict/batch"  # Batch scoring endpoint
 HEALTH_URL = "http://127.0.0.1:8000/health"  # Health check endpoint
 
+HEALTH_TTL_SECONDS = 15   # How long a health/model-info response is reused
+BATCH_CHUNK_SIZE = 500    # Rows per /predict/batch request
+MAX_PARALLEL_REQUESTS = 4 # Concurrent batch requests in flight
+RESULTS_PAGE_SIZE = 100   # Rows per page in the results table
+REQUEST_TIMEOUT = 30      # Seconds per API call
+
+# Keep ID-like CSV columns as text instead of letting read_csv infer numbers
+CSV_STRING_COLUMNS = {
+    "signup_time": str, "purchase_time": str, "device_id": str, "source": str,
+    "browser": str, "sex": str, "ip_address": str, "transaction_country": str
+}
+
+
+# ========================
+# HTTP HELPERS
+# ========================
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """
+    Pooled HTTP session shared across reruns, sized for the batch workers
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_PARALLEL_REQUESTS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_data(ttl=HEALTH_TTL_SECONDS, show_spinner=False)
+def fetch_health() -> dict:
+    """
+    Health/model-info response, cached for HEALTH_TTL_SECONDS
+    """
+    response = get_http_session().get(HEALTH_URL, timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+
+def parse_uploaded_transactions(uploaded_file) -> list:
+    """
+    Parse a JSON (object or list), JSONL or CSV upload into a list of transaction dicts
+    """
+    name = uploaded_file.name.lower()
+    raw = uploaded_file.getvalue()
+
+    if name.endswith(".csv"):
+        df = pd.read_csv(io.BytesIO(raw), dtype=CSV_STRING_COLUMNS)
+        # Drop empty cells so optional fields fall back to their API defaults
+        return [{k: v for k, v in row.items() if pd.notna(v)} for row in df.to_dict(orient="records")]
+
+    text = raw.decode("utf-8")
+    if name.endswith(".jsonl"):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    data = json.loads(text)
+    if isinstance(data, dict):
+        # Either a single transaction or a {"transactions": [...]} batch payload
+        return data["transactions"] if "transactions" in data else [data]
+    return list(data)
+
+
+def score_chunk(chunk: list) -> list:
+    """
+    Score one chunk of transactions through the batch endpoint
+    """
+    response = get_http_session().post(BATCH_API_URL, json={"transactions": chunk}, timeout=REQUEST_TIMEOUT)
+    if response.status_code != 200:
+        raise RuntimeError(f"API Error: {response.status_code} - {response.text}")
+    return response.json()["predictions"]
+
+
+def score_transactions(transactions: list, on_progress=None) -> list:
+    """
+    Score transactions in BATCH_CHUNK_SIZE chunks, with at most MAX_PARALLEL_REQUESTS
+    requests in flight. Results come back in input order.
+    """
+    chunks = [transactions[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(transactions), BATCH_CHUNK_SIZE)]
+    results = [None] * len(chunks)
+    done_rows = 0
+
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as executor:
+        futures = {executor.submit(score_chunk, chunk): idx for idx, chunk in enumerate(chunks)}
+        for future in as_completed(futures):
+            idx = futures[future]
+            results[idx] = future.result()
+            done_rows += len(chunks[idx])
+            if on_progress is not None:
+                on_progress(done_rows, len(transactions))
+
+    return [prediction for chunk_result in results for prediction in chunk_result]
+
 # Enhanced page configuration
 st.set_page_config(
     page_title="Fraud Detection Dashboard",
@@ -58,14 +154,12 @@ with st.sidebar:
     
     # Check API health
     try:
-        health_response = requests.get(HEALTH_URL, timeout=5)
-        if health_response.status_code == 200:
-            health_data = health_response.json()
-            st.success("✅ API Connected")
-            st.info(f"Model: {health_data.get('model_type', 'Unknown')}")
-            st.info(f"Features: {health_data.get('features', 0)}")
-        else:
-            st.error("❌ API Error")
+        health_data = fetch_health()
+        st.success("✅ API Connected")
+        st.info(f"Model: {health_data.get('model_type', 'Unknown')}")
+        st.info(f"Features: {health_data.get('features', 0)}")
+    except requests.HTTPError:
+        st.error("❌ API Error")
     except Exception as e:
         st.error("❌ API Unreachable")
         st.error(f"Error: {str(e)}")
@@ -78,7 +172,7 @@ with st.sidebar:
     st.divider()
     st.markdown("### 📝 Instructions")
     st.markdown("""
-    1. Fill in transaction details OR upload JSON
+    1. Fill in transaction details OR upload JSON/JSONL/CSV
     2. Click 'Check Fraud Risk'
     3. Review prediction results
     """)
@@ -146,7 +240,7 @@ if submitted:
     }
 
     try:
-        response = requests.post(API_URL, json=payload)
+        response = get_http_session().post(API_URL, json=payload, timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             result = response.json()
             fraud_prob = result["fraud_probability"]
@@ -167,33 +261,78 @@ if submitted:
 
 
 # ========================
-# JSON Upload Option
+# File Upload Option
 # ========================
 st.markdown("---")
-st.markdown("### 📂 Or Upload a JSON File")
+st.markdown("### 📂 Or Upload a Transactions File")
 
-uploaded_file = st.file_uploader("Upload JSON transaction file", type=["json"])
+uploaded_file = st.file_uploader(
+    "Upload JSON, JSONL or CSV transactions",
+    type=["json", "jsonl", "csv"],
+    help="A single JSON transaction, a JSON list, one transaction per line (JSONL) or a CSV with one row per transaction"
+)
 
 if uploaded_file is not None:
-    try:
-        transaction_data = json.load(uploaded_file)
-        st.json(transaction_data)
+    # Score each upload once; page changes and other reruns reuse the stored results.
+    # file_id changes on every new upload, even of a file with the same name and size.
+    upload_key = uploaded_file.file_id
+    if st.session_state.get("upload_key") != upload_key:
+        try:
+            transactions = parse_uploaded_transactions(uploaded_file)
+        except Exception as e:
+            st.error(f"Invalid transactions file. Error: {str(e)}")
+            st.stop()
 
-        response = requests.post(API_URL, json=transaction_data)
-        if response.status_code == 200:
-            result = response.json()
-            fraud_prob = result["fraud_probability"]
-            fraud_label = result["fraud_label"]
+        st.caption(f"Loaded {len(transactions):,} transaction(s). Scoring...")
+        progress = st.progress(0.0)
+        started = time.perf_counter()
 
-            st.subheader("📊 Prediction Results (from JSON)")
-            st.metric("Fraud Probability", f"{fraud_prob * 100:.2f}%")
-            st.metric("Fraud Label", "🚨 Fraud" if fraud_label == 1 else "✅ Genuine")
+        try:
+            predictions = score_transactions(
+                transactions,
+                on_progress=lambda done, total: progress.progress(done / total, text=f"Scored {done:,}/{total:,}")
+            )
+        except Exception as e:
+            st.error(f"Could not score transactions. Error: {str(e)}")
+            st.stop()
 
-            if fraud_label == 1:
-                st.error("⚠️ High risk: This transaction is likely FRAUDULENT.")
-            else:
-                st.success("✅ Safe: This transaction is likely genuine.")
-        else:
-            st.error(f"API Error: {response.status_code} - {response.text}")
-    except Exception as e:
-        st.error(f"Invalid JSON file. Error: {str(e)}")
+        results_df = pd.DataFrame(transactions)
+        results_df["fraud_probability"] = [p["fraud_probability"] for p in predictions]
+        results_df["fraud_label"] = [p["fraud_label"] for p in predictions]
+        results_df["confidence"] = [p["confidence"] for p in predictions]
+
+        st.session_state["upload_key"] = upload_key
+        st.session_state["upload_results"] = results_df
+        # Encoded once: the download button needs the bytes on every rerun
+        st.session_state["upload_csv"] = results_df.to_csv(index=False).encode("utf-8")
+        st.session_state["upload_elapsed"] = time.perf_counter() - started
+        progress.empty()
+
+    results_df = st.session_state["upload_results"]
+
+    # Summary fraud statistics
+    st.subheader("📊 Prediction Results (from file)")
+    n_rows = len(results_df)
+    n_fraud = int(results_df["fraud_label"].sum()) if n_rows else 0
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Transactions", f"{n_rows:,}")
+    col2.metric("Flagged as Fraud", f"{n_fraud:,}")
+    col3.metric("Fraud Rate", f"{(n_fraud / n_rows if n_rows else 0) * 100:.2f}%")
+    col4.metric("Mean Fraud Probability", f"{(results_df['fraud_probability'].mean() if n_rows else 0) * 100:.2f}%")
+    st.caption(f"Scored in {st.session_state['upload_elapsed']:.2f}s")
+
+    # Paginated results table
+    show_only_fraud = st.checkbox("Show only flagged transactions")
+    view_df = results_df[results_df["fraud_label"] == 1] if show_only_fraud else results_df
+    n_pages = max(1, -(-len(view_df) // RESULTS_PAGE_SIZE))
+    page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1) if n_pages > 1 else 1
+    start = (page - 1) * RESULTS_PAGE_SIZE
+    st.dataframe(view_df.iloc[start:start + RESULTS_PAGE_SIZE], use_container_width=True)
+    st.caption(f"Page {page} of {n_pages}")
+
+    st.download_button(
+        "⬇️ Download Results (CSV)",
+        st.session_state["upload_csv"],
+        file_name="fraud_predictions.csv",
+        mime="text/csv"
+    )
@@ -2,17 +2,30 @@
 import streamlit as st
 import joblib
 import pandas as pd
-import shap
-import matplotlib.pyplot as plt
-import numpy as np
+
+# shap and matplotlib are only imported when an explanation is requested
 
 st.set_page_config(page_title="Fraud Detection Dashboard", layout="centered")
 st.title("🛡️ AdeyGuard Fraud Detection Dashboard")
 st.write("Upload a transaction to predict fraud risk.")
 
+@st.cache_resource
+def load_pipeline(path: str = "models/XGBoost_pipeline.pkl"):
+    """
+    Unpickle the pipeline once per server process, not on every rerun
+    """
+    return joblib.load(path)
+
+
+@st.cache_resource
+def get_explainer(_model):
+    import shap
+    return shap.TreeExplainer(_model)
+
+
 # Load the full pipeline
 try:
-    pipeline = joblib.load("models/XGBoost_pipeline.pkl")
+    pipeline = load_pipeline()
     st.success("✅ Model pipeline loaded successfully!")
 except Exception as e:
     st.error(f"❌ Failed to load model: {e}")
@@ -57,26 +70,30 @@ if uploaded:
         st.write(f"### Prediction: {pred}")
         st.write(f"**Fraud Probability:** {proba:.2%}")
 
-        # SHAP Explanation
+        # SHAP Explanation (on demand)
         st.subheader("🔍 Why This Was Flagged")
 
-        # Use the trained XGBoost model directly with SHAP
-        explainer = shap.TreeExplainer(model)
-        X_processed = preprocessor.transform(X)
-        shap_values = explainer.shap_values(X_processed)
-
-        # Waterfall plot for first row
-        fig, ax = plt.subplots(figsize=(8, 6))
-        shap.waterfall_plot(
-            shap.Explanation(
-                values=shap_values[0],
-                base_values=explainer.expected_value,
-                data=X.iloc[0]
-            ),
-            max_display=8
-        )
-        st.pyplot(fig)
-        plt.close()
+        if st.checkbox("Explain this prediction"):
+            import shap
+            import matplotlib.pyplot as plt
+
+            # Use the trained XGBoost model directly with SHAP
+            explainer = get_explainer(model)
+            X_processed = preprocessor.transform(X.iloc[[0]])
+            shap_values = explainer.shap_values(X_processed)
+
+            # Waterfall plot for first row
+            fig, ax = plt.subplots(figsize=(8, 6))
+            shap.waterfall_plot(
+                shap.Explanation(
+                    values=shap_values[0],
+                    base_values=explainer.expected_value,
+                    data=X.iloc[0]
+                ),
+                max_display=8
+            )
+            st.pyplot(fig)
+            plt.close()
 
     except Exception as e:
         st.error(f"❌ Error during prediction: {e}")
\ No newline at end of file
@@ -0,0 +1,97 @@
+# benchmarks/cascade_benchmark.py
+"""
+Benchmark cascade scoring against the full model on realistic traffic mixes.
+
+Uses the models written by src/models/Train.py (models/XGBoost.pkl and
+models/creditcard_cascade.json) and samples traffic from Data/creditcard.csv at several
+fraud rates. For each mix it reports, for full-model and cascade scoring:
+  - per-request latency (mean and p99) when transactions arrive one at a time
+  - batch throughput (rows/s) when scoring the whole sample at once
+  - the share answered by stage 1 and recall/precision at the 0.2 threshold
+
+Usage (from project root):
+    python benchmarks/cascade_benchmark.py --rows 5000 --fraud-rates 0.0017,0.01,0.05
+"""
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.models.cascade import CascadeModel
+
+
+def sample_traffic(df, target, n_rows, fraud_rate, rng):
+    fraud = df[df[target] == 1]
+    legit = df[df[target] == 0]
+    n_fraud = max(1, int(round(n_rows * fraud_rate)))
+    sample = pd.concat([
+        fraud.sample(n_fraud, replace=len(fraud) < n_fraud, random_state=rng.integers(1 << 31)),
+        legit.sample(n_rows - n_fraud, random_state=rng.integers(1 << 31)),
+    ])
+    return sample.sample(frac=1, random_state=rng.integers(1 << 31))
+
+
+def recall_precision(y_true, y_pred):
+    tp = np.sum((y_pred == 1) & (y_true == 1))
+    return tp / max(np.sum(y_true == 1), 1), tp / max(np.sum(y_pred == 1), 1)
+
+
+def time_single(score_one, X):
+    latencies = np.empty(len(X))
+    for i in range(len(X)):
+        t0 = time.perf_counter()
+        score_one(X[i:i + 1])
+        latencies[i] = time.perf_counter() - t0
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cascade vs full-model scoring benchmark")
+    parser.add_argument("--data", default="Data/creditcard.csv")
+    parser.add_argument("--heavy-model", default="models/XGBoost.pkl")
+    parser.add_argument("--cascade", default="models/creditcard_cascade.json")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--fraud-rates", default="0.0017,0.01,0.05")
+    args = parser.parse_args()
+
+    heavy = joblib.load(args.heavy_model)
+    cascade = CascadeModel.load(args.cascade)
+    df = pd.read_csv(args.data)
+    target = "Class" if "Class" in df.columns else "class"
+    rng = np.random.default_rng(42)
+
+    # Train.py fits the tree models on standardized features
+    def heavy_proba(X_raw):
+        return heavy.predict_proba((X_raw - cascade.mean) / cascade.scale)[:, 1]
+
+    def cascade_proba(X_raw):
+        return cascade.score(X_raw, lambda rows: heavy_proba(X_raw[rows]))
+
+    print(f"Band [{cascade.low:.4f}, {cascade.high:.4f}) | threshold {cascade.threshold}\n")
+    print(f"{'fraud rate':>10} {'mode':>8} {'mean ms':>8} {'p99 ms':>8} {'rows/s':>10} "
+          f"{'stage-1':>8} {'recall':>7} {'precision':>9}")
+    for fraud_rate in (float(r) for r in args.fraud_rates.split(",")):
+        traffic = sample_traffic(df, target, args.rows, fraud_rate, rng)
+        X = traffic[cascade.feature_columns].fillna(0).to_numpy(dtype=np.float64)
+        y = traffic[target].to_numpy()
+
+        for mode, score in (("full", heavy_proba), ("cascade", lambda X_: cascade_proba(X_)[0])):
+            latencies = time_single(score, X)
+            t0 = time.perf_counter()
+            probs = score(X)
+            throughput = len(X) / (time.perf_counter() - t0)
+
+            fast_share = float(np.mean(~cascade.in_band(cascade.fast_proba(X)))) if mode == "cascade" else 0.0
+            recall, precision = recall_precision(y, (probs >= cascade.threshold).astype(int))
+            print(f"{fraud_rate:>10.4f} {mode:>8} {latencies.mean() * 1e3:>8.3f} "
+                  f"{np.percentile(latencies, 99) * 1e3:>8.3f} {throughput:>10.0f} "
+                  f"{fast_share:>7.1%} {recall:>7.4f} {precision:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# benchmarks/columnar_benchmark.py
+"""
+Benchmark columnar ingestion (/predict/columnar) against the JSON batch path.
+
+Runs the API in-process (FastAPI TestClient, so there is no network noise)
+with the model from models/, and scores the same transactions as:
+  - json:    /predict/batch in chunks of MAX_BATCH_SIZE rows
+  - arrow:   one Arrow IPC stream per request
+  - msgpack: one msgpack map of column arrays per request
+For each it reports the client-side encode time and the request time
+(server parse + feature building + scoring + response encoding), both per
+10k rows, and checks that all paths return the same probabilities.
+
+With frequency sketches loaded it also times the sketch update on its own,
+from Arrow columns (as /predict/columnar) and from Python lists (as
+/predict/batch), since keys for string columns are still hashed as text.
+
+Transactions are sampled from Data/Fraud_Data.csv. Labels the encoders have
+not seen are replaced with a known class so every path scores every row.
+
+Usage (from project root):
+    python benchmarks/columnar_benchmark.py --rows 10000 --repeat 3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("FRAUD_AUDIT_DIR", "")  # keep the audit writer out of the timings
+
+import api  # noqa: E402
+from src.utils import columnar  # noqa: E402
+
+PER_ROWS = 10_000
+
+
+def load_transactions(path: str, n_rows: int, encoders: dict) -> pd.DataFrame:
+    df = pd.read_csv(path, nrows=n_rows)
+    df = df.sample(n_rows, replace=len(df) < n_rows, random_state=42).reset_index(drop=True)
+    if "transaction_country" not in df.columns:
+        df["transaction_country"] = str(encoders["country"].classes_[0])
+    for column, encoder in (("source", "source"), ("browser", "browser"), ("sex", "sex"),
+                            ("transaction_country", "country")):
+        known = set(str(c) for c in encoders[encoder].classes_)
+        df[column] = df[column].astype(str).where(df[column].astype(str).isin(known), str(encoders[encoder].classes_[0]))
+    df["ip_address"] = df["ip_address"].astype(str)
+    df["device_id"] = df["device_id"].astype(str)
+    return df[list(api.TRANSACTION_COLUMNS)]
+
+
+def run_json(client, df):
+    t0 = time.perf_counter()
+    bodies = [json.dumps({"transactions": chunk.to_dict(orient="records")})
+              for chunk in (df.iloc[i:i + api.MAX_BATCH_SIZE] for i in range(0, len(df), api.MAX_BATCH_SIZE))]
+    t1 = time.perf_counter()
+    probs = []
+    for body in bodies:
+        response = client.post("/predict/batch", content=body, headers={"content-type": "application/json"})
+        response.raise_for_status()
+        probs.extend(p["fraud_probability"] for p in response.json()["predictions"])
+    return t1 - t0, time.perf_counter() - t1, np.array(probs)
+
+
+def run_columnar(client, df, content_type):
+    import pyarrow as pa
+
+    t0 = time.perf_counter()
+    body = columnar.write_table(pa.Table.from_pandas(df, preserve_index=False), content_type)
+    t1 = time.perf_counter()
+    response = client.post("/predict/columnar", content=body, headers={"content-type": content_type})
+    response.raise_for_status()
+    result = columnar.read_table(response.content, content_type)
+    return t1 - t0, time.perf_counter() - t1, result.column("fraud_probability").to_numpy()
+
+
+def time_sketches(df, repeat):
+    """
+    Best time of update_and_query_columns on a fresh copy of the sketches,
+    from Arrow arrays and from Python lists
+    """
+    import pyarrow as pa
+
+    columns = [c for c in api.frequency_encoder.columns if c in df.columns]
+    inputs = {
+        "arrow": {c: pa.array(df[c]) for c in columns},
+        "lists": {c: df[c].tolist() for c in columns},
+    }
+    times = {}
+    for name, values in inputs.items():
+        best = None
+        for _ in range(repeat):
+            encoder = type(api.frequency_encoder).load(api.FREQUENCY_SKETCH_PATH)
+            t0 = time.perf_counter()
+            encoder.update_and_query_columns(values)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        times[name] = best
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar vs JSON batch scoring benchmark")
+    parser.add_argument("--data", default="Data/Fraud_Data.csv")
+    parser.add_argument("--rows", type=int, default=PER_ROWS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    with TestClient(api.app) as client:
+        df = load_transactions(args.data, args.rows, api.model_info["encoders"])
+        # Frequency sketches count every scored row; reset them per run so all paths see the same counts
+        sketch_state = api.frequency_encoder
+
+        paths = {
+            "json": lambda: run_json(client, df),
+            "arrow": lambda: run_columnar(client, df, columnar.ARROW_STREAM),
+            "msgpack": lambda: run_columnar(client, df, columnar.MSGPACK),
+        }
+        scale = PER_ROWS / len(df)
+        print(f"{len(df)} rows, best of {args.repeat} | times per {PER_ROWS} rows\n")
+        print(f"{'path':>8} {'encode ms':>10} {'request ms':>11} {'rows/s':>10} {'max |dp|':>9}")
+        reference = None
+        for name, run in paths.items():
+            best = None
+            for _ in range(args.repeat):
+                if sketch_state is not None:
+                    api.frequency_encoder = type(sketch_state).load(api.FREQUENCY_SKETCH_PATH)
+                encode_s, request_s, probs = run()
+                if best is None or request_s < best[1]:
+                    best = (encode_s, request_s, probs)
+            encode_s, request_s, probs = best
+            reference = probs if reference is None else reference
+            print(f"{name:>8} {encode_s * scale * 1e3:>10.1f} {request_s * scale * 1e3:>11.1f} "
+                  f"{len(df) / request_s:>10.0f} {np.max(np.abs(probs - reference)):>9.2e}")
+
+        if sketch_state is not None:
+            print(f"\n{'sketches':>8} {'update ms':>10}")
+            for name, elapsed in time_sketches(df, args.repeat).items():
+                print(f"{name:>8} {elapsed * scale * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# benchmarks/serving_benchmark.py
+"""
+Benchmark the prefork server (serve.py) from 1 to N workers.
+
+For each worker count the script starts serve.py, waits for /ready, then
+reports per-worker memory and /predict throughput:
+  - RSS: resident memory of each worker, counting shared model pages in full
+  - PSS: proportional set size, shared pages split between the processes
+         sharing them. PSS staying flat as workers are added is what shows
+         the model is shared copy-on-write rather than duplicated.
+  - req/s: /predict throughput with a fixed client concurrency
+
+Memory figures read /proc/<pid>/smaps_rollup, so they are Linux-only.
+
+Usage (from project root, with the model in models/):
+    python benchmarks/serving_benchmark.py --max-workers 4 --requests 4000
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SAMPLE_PATH = os.path.join(ROOT, "fraud_sample.json")
+
+
+def read_memory_kb(pid: int) -> dict:
+    """
+    Return {'rss': kB, 'pss': kB} for a process
+    """
+    memory = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss"):
+                memory[key.lower()] = int(value.split()[0])
+    return memory
+
+
+def child_pids(pid: int) -> list:
+    children = []
+    task_dir = f"/proc/{pid}/task"
+    for tid in os.listdir(task_dir):
+        with open(f"{task_dir}/{tid}/children") as f:
+            children.extend(int(p) for p in f.read().split())
+    return children
+
+
+def wait_until_ready(base_url: str, n_workers: int, server_pid: int, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/ready", timeout=1).status_code == 200 \
+                    and len(child_pids(server_pid)) >= n_workers:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    raise TimeoutError(f"Server with {n_workers} worker(s) not ready after {timeout}s")
+
+
+def run_load(base_url: str, payload: dict, n_requests: int, concurrency: int) -> float:
+    """
+    Fire n_requests /predict calls from `concurrency` threads, return req/s
+    """
+    per_thread = n_requests // concurrency
+
+    def client(_):
+        session = requests.Session()
+        for _ in range(per_thread):
+            response = session.post(f"{base_url}/predict", json=payload, timeout=30)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(client, range(concurrency)))
+    return per_thread * concurrency / (time.perf_counter() - started)
+
+
+def benchmark(n_workers: int, args, payload: dict) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "serve.py"), "--workers", str(n_workers),
+         "--port", str(args.port), "--max-requests", "0"],
+        cwd=ROOT, stdout=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(base_url, n_workers, server.pid)
+        # Warm every worker before measuring
+        run_load(base_url, payload, n_workers * 20, n_workers)
+        throughput = run_load(base_url, payload, args.requests, args.concurrency)
+
+        workers = [read_memory_kb(pid) for pid in child_pids(server.pid)]
+        parent = read_memory_kb(server.pid)
+        return {
+            "workers": n_workers,
+            "req_per_s": throughput,
+            "parent_rss_mb": parent["rss"] / 1024,
+            "worker_rss_mb": sum(w["rss"] for w in workers) / len(workers) / 1024,
+            "worker_pss_mb": sum(w["pss"] for w in workers) / len(workers) / 1024,
+            "total_pss_mb": (parent["pss"] + sum(w["pss"] for w in workers)) / 1024,
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prefork serving from 1 to N workers")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with open(SAMPLE_PATH) as f:
+        payload = json.load(f)
+
+    counts = sorted({1, *[n for n in (2, 4, 8, 16, 32) if n < args.max_workers], args.max_workers})
+    results = []
+    for n in counts:
+        print(f"⏳ Benchmarking {n} worker(s)...")
+        results.append(benchmark(n, args, payload))
+
+    base = results[0]["req_per_s"]
+    print(f"\n{'workers':>7} {'req/s':>9} {'speedup':>8} {'parent RSS':>11} "
+          f"{'worker RSS':>11} {'worker PSS':>11} {'total PSS':>10}")
+    for r in results:
+        print(f"{r['workers']:>7} {r['req_per_s']:>9.1f} {r['req_per_s'] / base:>7.2f}x "
+              f"{r['parent_rss_mb']:>9.1f}MB {r['worker_rss_mb']:>9.1f}MB "
+              f"{r['worker_pss_mb']:>9.1f}MB {r['total_pss_mb']:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# check_compact_dtypes.py
+"""
+Check that compact-dtype loading does not change model quality.
+
+Loads Data/creditcard.csv with the default and the compact (float32) loader,
+trains the same XGBoost model on each with the same split and seed, and fails
+if ROC-AUC or PR-AUC moves by more than the tolerance.
+
+Usage:
+    python check_compact_dtypes.py [--tolerance 0.002]
+"""
+import argparse
+import importlib.util
+import os
+import sys
+
+from sklearn.metrics import auc, precision_recall_curve, roc_auc_score
+from sklearn.model_selection import train_test_split
+from xgboost import XGBClassifier
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# "load&merge.py" is not a valid module name, so load it by path
+_spec = importlib.util.spec_from_file_location("load_merge", os.path.join(ROOT, "src", "data_input", "load&merge.py"))
+load_merge = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(load_merge)
+
+
+def evaluate(df):
+    X = df.drop(columns=["Class"])
+    y = df["Class"]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    model = XGBClassifier(n_estimators=200, eval_metric="logloss", random_state=42, n_jobs=1)
+    model.fit(X_train, y_train)
+    y_prob = model.predict_proba(X_test)[:, 1]
+    precision, recall, _ = precision_recall_curve(y_test, y_prob)
+    return {"roc_auc": roc_auc_score(y_test, y_prob), "pr_auc": auc(recall, precision)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare model metrics for default vs compact dtypes")
+    parser.add_argument("--data", default=os.path.join(ROOT, "Data", "creditcard.csv"))
+    parser.add_argument("--tolerance", type=float, default=0.002)
+    args = parser.parse_args()
+
+    default_df = load_merge.load_credit_data(args.data)
+    compact_df = load_merge.load_credit_data(args.data, compact=True)
+    print(f"🧮 Memory: default {load_merge.memory_mb(default_df):.1f} MB, "
+          f"compact {load_merge.memory_mb(compact_df):.1f} MB")
+
+    default_metrics = evaluate(default_df)
+    compact_metrics = evaluate(compact_df)
+
+    failed = False
+    for metric in default_metrics:
+        diff = abs(default_metrics[metric] - compact_metrics[metric])
+        ok = diff <= args.tolerance
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {metric}: default {default_metrics[metric]:.4f} | "
+              f"compact {compact_metrics[metric]:.4f} | diff {diff:.4f} (tolerance {args.tolerance})")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
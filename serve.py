@@ -0,0 +1,243 @@
+# serve.py
+"""
+Prefork launcher for the E-Commerce Fraud Detection API.
+
+The parent process imports api.py once (unpickling the XGBoost pipeline and
+encoders), binds the listening socket and then forks N uvicorn workers that
+accept on the shared socket. Workers inherit the loaded model and share its
+pages copy-on-write with the parent, so adding a worker costs only its own
+request-path memory instead of a second copy of the model.
+
+Workers are recycled after --max-requests requests (with jitter so they do not
+all restart at once) and replaced by the parent. The parent handles:
+  - SIGTERM / SIGINT: graceful shutdown of all workers, then exit
+  - SIGHUP: graceful rolling restart of all workers
+  - SIGTTIN / SIGTTOU: add / remove one worker
+
+Usage:
+    python serve.py --workers 4 --port 8000
+"""
+import os
+
+# One native thread per worker: N workers already use N cores, and OpenMP
+# thread pools created before fork are not safe to reuse in the children.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+import argparse
+import gc
+import random
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+# Workers that die faster than this after spawning are treated as crashing
+MIN_WORKER_LIFETIME = 1.0
+POLL_INTERVAL = 0.2
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Prefork server for the fraud detection API")
+    parser.add_argument("--host", default=os.environ.get("FRAUD_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("FRAUD_API_PORT", 8000)))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("FRAUD_API_WORKERS", os.cpu_count() or 1)),
+                        help="Number of worker processes (default: FRAUD_API_WORKERS or CPU count)")
+    parser.add_argument("--max-requests", type=int,
+                        default=int(os.environ.get("FRAUD_API_MAX_REQUESTS", 10000)),
+                        help="Recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=1000,
+                        help="Random extra requests added per worker to stagger recycling")
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="Seconds a worker gets to finish in-flight requests on shutdown")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    return args
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """
+    Create the listening socket in the parent so every worker accepts on it
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    def __init__(self, app, args):
+        self.app = app
+        self.args = args
+        self.sock = bind_socket(args.host, args.port)
+        self.num_workers = args.workers
+        self.workers = {}  # pid -> spawn time
+        self.retiring = set()  # pids asked to exit that still count as alive
+        self.shutting_down = False
+        self.shutdown_deadline = None
+
+    # ---------- workers ----------
+    def _worker_max_requests(self):
+        if self.args.max_requests <= 0:
+            return None
+        return self.args.max_requests + random.randint(0, max(self.args.max_requests_jitter, 0))
+
+    def spawn_worker(self):
+        pid = os.fork()
+        if pid != 0:
+            self.workers[pid] = time.monotonic()
+            return pid
+
+        # ----- child -----
+        exit_code = 0
+        try:
+            random.seed()
+            # Drop the parent's handlers: they act on the parent's worker table
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            for sig in (signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU):
+                signal.signal(sig, signal.SIG_IGN)
+            config = uvicorn.Config(
+                self.app,
+                limit_max_requests=self._worker_max_requests(),
+                timeout_graceful_shutdown=self.args.graceful_timeout,
+                access_log=False,
+            )
+            # uvicorn installs its own SIGTERM/SIGINT handlers for a graceful exit
+            uvicorn.Server(config).run(sockets=[self.sock])
+        except BaseException as e:
+            print(f"❌ Worker {os.getpid()} crashed: {e}", file=sys.stderr)
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def signal_workers(self, sig, pids=None):
+        for pid in list(self.workers if pids is None else pids):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def retire_workers(self, pids):
+        """
+        Ask workers to finish in-flight requests and exit; replacements are
+        spawned right away because retiring workers no longer count as active
+        """
+        pids = list(pids)
+        self.retiring.update(pids)
+        self.signal_workers(signal.SIGTERM, pids)
+
+    @property
+    def active_workers(self):
+        return len(self.workers) - len(self.retiring)
+
+    def reap_workers(self):
+        """
+        Collect exited workers, return (pid, spawned_at, status) tuples
+        """
+        exited = []
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            spawned_at = self.workers.pop(pid, None)
+            self.retiring.discard(pid)
+            if spawned_at is not None:
+                exited.append((pid, spawned_at, status))
+        return exited
+
+    # ---------- signals ----------
+    def handle_shutdown(self, signum, frame):
+        if not self.shutting_down:
+            print(f"🛑 Received {signal.Signals(signum).name}, stopping {len(self.workers)} worker(s)...")
+            self.shutting_down = True
+            self.shutdown_deadline = time.monotonic() + self.args.graceful_timeout
+            self.signal_workers(signal.SIGTERM)
+
+    def handle_reload(self, signum, frame):
+        print("🔄 Recycling all workers...")
+        self.retire_workers(self.workers)
+
+    def handle_increase(self, signum, frame):
+        self.num_workers += 1
+        print(f"➕ Worker count -> {self.num_workers}")
+
+    def handle_decrease(self, signum, frame):
+        if self.num_workers > 1:
+            self.num_workers -= 1
+            print(f"➖ Worker count -> {self.num_workers}")
+
+    # ---------- main loop ----------
+    def run(self):
+        signal.signal(signal.SIGTERM, self.handle_shutdown)
+        signal.signal(signal.SIGINT, self.handle_shutdown)
+        signal.signal(signal.SIGHUP, self.handle_reload)
+        signal.signal(signal.SIGTTIN, self.handle_increase)
+        signal.signal(signal.SIGTTOU, self.handle_decrease)
+
+        # Move everything allocated so far (model, encoders, modules) out of the
+        # collector's generations, so GC passes in the workers do not write to
+        # those pages and break copy-on-write sharing.
+        gc.collect()
+        gc.freeze()
+
+        print(f"🚀 Serving on http://{self.args.host}:{self.args.port} with {self.num_workers} worker(s) "
+              f"(parent pid {os.getpid()})")
+
+        while True:
+            for pid, spawned_at, status in self.reap_workers():
+                code = os.waitstatus_to_exitcode(status)
+                if not self.shutting_down:
+                    print(f"♻️  Worker {pid} exited (code {code}), replacing")
+                    if code != 0 and time.monotonic() - spawned_at < MIN_WORKER_LIFETIME:
+                        # Avoid a tight respawn loop when workers crash on start-up
+                        time.sleep(1.0)
+
+            if self.shutting_down:
+                if not self.workers:
+                    break
+                if time.monotonic() > self.shutdown_deadline:
+                    print("⚠️  Graceful timeout exceeded, killing remaining workers")
+                    self.signal_workers(signal.SIGKILL)
+                    self.shutdown_deadline = float("inf")
+            else:
+                while self.active_workers < self.num_workers:
+                    self.spawn_worker()
+                if self.active_workers > self.num_workers:
+                    candidates = [pid for pid in self.workers if pid not in self.retiring]
+                    oldest = min(candidates, key=self.workers.get)
+                    self.retire_workers([oldest])
+
+            time.sleep(POLL_INTERVAL)
+
+        self.sock.close()
+        print("✅ All workers stopped")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Load and warm the model exactly once, in the parent; the workers' lifespan
+    # hook sees it already loaded. OMP_NUM_THREADS=1 keeps the warm-up
+    # prediction from starting an OpenMP pool before fork.
+    import api
+    if not api.load_model():
+        print("⚠️  Starting without a loaded model; /predict will return 500")
+    # Online state (drift histograms, frequency sketch counts) lives in shared
+    # memory, so it covers every worker and survives worker recycling
+    api.share_across_workers()
+    app = api.app
+
+    PreforkServer(app, args).run()
+
+
+if __name__ == "__main__":
+    main()
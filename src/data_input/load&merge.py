@@ -2,7 +2,7 @@
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-from src.utils.helpers import ip_to_int
+from src.utils.helpers import ip_to_int, ips_to_int
 import pandas as pd
 
 
@@ -31,11 +31,95 @@ def float_to_ip(ip_num: float) -> str:
         return "0.0.0.0"
 
 
-def load_fraud_data(path: str) -> pd.DataFrame:
+# Explicit read_csv schemas for compact mode: no type inference while parsing,
+# float32 instead of float64, categoricals for low-cardinality strings
+CREDIT_SCHEMA = {
+    'Time': 'float32',
+    **{f'V{i}': 'float32' for i in range(1, 29)},
+    'Amount': 'float32',
+    'Class': 'int8',
+}
+
+FRAUD_SCHEMA = {
+    'user_id': 'uint32',
+    'signup_time': 'object',
+    'purchase_time': 'object',
+    'purchase_value': 'float32',
+    'device_id': 'object',  # near-unique per row: a categorical would not save memory
+    'source': 'category',
+    'browser': 'category',
+    'sex': 'category',
+    'age': 'uint8',
+    'ip_address': 'float64',  # corrupted float IPs, converted to uint32 below
+    'class': 'int8',
+}
+
+IP_COUNTRY_SCHEMA = {
+    'lower_bound_ip_address': 'float64',
+    'upper_bound_ip_address': 'float64',
+    'country': 'category',
+}
+
+# dtypes pandas would infer for each compact dtype, used for the "before" figure
+_DEFAULT_DTYPES = {'float32': 'float64', 'int8': 'int64', 'uint8': 'int64', 'uint32': 'int64', 'category': 'object'}
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def default_memory_mb(df: pd.DataFrame) -> float:
+    """
+    Memory the frame would take with the dtypes read_csv infers by default.
+    Converted one column at a time so the estimate stays cheap.
+    """
+    total = df.index.memory_usage()
+    for col in df.columns:
+        default = _DEFAULT_DTYPES.get(str(df[col].dtype))
+        series = df[col].astype(default) if default else df[col]
+        total += series.memory_usage(deep=True, index=False)
+    return total / 1024 ** 2
+
+
+def report_memory(name: str, df: pd.DataFrame) -> None:
+    before, after = default_memory_mb(df), memory_mb(df)
+    print(f"🧮 {name} memory: {before:.1f} MB -> {after:.1f} MB ({before / after if after else 0:.1f}x smaller)")
+
+
+def _schema_for(path: str, schema: dict) -> dict:
+    """
+    Restrict a schema to the columns actually present in the file
+    """
+    columns = pd.read_csv(path, nrows=0).columns
+    return {col: dtype for col, dtype in schema.items() if col in columns}
+
+
+def load_fraud_data(path: str, compact: bool = False) -> pd.DataFrame:
+    """
+    Load the e-commerce fraud data.
+    With compact=True, columns are parsed with FRAUD_SCHEMA and the IP is kept
+    only as a uint32 'ip_int' (no dotted-string 'ip_address' column).
+    """
     print("🔍 Loading fraud transaction data...")
-    df = pd.read_csv(path)
+    if compact:
+        df = pd.read_csv(path, dtype=_schema_for(path, FRAUD_SCHEMA))
+    else:
+        df = pd.read_csv(path)
     print(f"✅ Loaded fraud data: shape = {df.shape}")
 
+    # Convert timestamps
+    df['signup_time'] = pd.to_datetime(df['signup_time'])
+    df['purchase_time'] = pd.to_datetime(df['purchase_time'])
+
+    if compact:
+        # Same result as the float_to_ip/ip_to_int path below (out-of-range IPs
+        # become 0, i.e. 0.0.0.0), without building strings
+        print("🔧 Converting corrupted IP addresses to uint32...")
+        df['ip_int'] = ips_to_int(df['ip_address'])
+        df = df.drop(columns=['ip_address'])
+        report_memory("Fraud data", df)
+        return df
+
     # Fix corrupted IP column
     print("🔧 Fixing corrupted IP addresses...")
     df['ip_address'] = df['ip_address'].astype(float).astype(int).apply(float_to_ip)
@@ -45,24 +129,26 @@ def load_fraud_data(path: str) -> pd.DataFrame:
     print("📌 Fixed IP samples:")
     print(df['ip_address'].head(10).tolist())
 
-    # Convert timestamps
-    df['signup_time'] = pd.to_datetime(df['signup_time'])
-    df['purchase_time'] = pd.to_datetime(df['purchase_time'])
-
     df['ip_int'] = df['ip_address'].apply(ip_to_int)
     return df
 
 
-def load_credit_data(path: str) -> pd.DataFrame:
+def load_credit_data(path: str, compact: bool = False) -> pd.DataFrame:
     """
     Load the credit card transaction data.
+    With compact=True, columns are parsed with CREDIT_SCHEMA (float32 features, int8 Class).
     """
     print("🔍 Loading credit card transaction data...")
     if not os.path.exists(path):
         raise FileNotFoundError(f"Credit card data file not found at: {path}")
     
-    df = pd.read_csv(path)
+    if compact:
+        df = pd.read_csv(path, dtype=_schema_for(path, CREDIT_SCHEMA))
+    else:
+        df = pd.read_csv(path)
     print(f"✅ Loaded credit card data: shape = {df.shape}")
+    if compact:
+        report_memory("Credit card data", df)
 
     missing = df.isnull().sum().sum()
     if missing > 0:
@@ -73,22 +159,29 @@ def load_credit_data(path: str) -> pd.DataFrame:
     return df
 
 
-def load_ip_country_data(path: str) -> pd.DataFrame:
+def load_ip_country_data(path: str, compact: bool = False) -> pd.DataFrame:
     """
     Load the IP address to country mapping data.
+    With compact=True, IP bounds are uint32 and country is categorical.
     """
     print("🔍 Loading IP-to-country mapping data...")
     if not os.path.exists(path):
         raise FileNotFoundError(f"IP country mapping file not found at: {path}")
     
-    df = pd.read_csv(path)
+    if compact:
+        df = pd.read_csv(path, dtype=_schema_for(path, IP_COUNTRY_SCHEMA))
+    else:
+        df = pd.read_csv(path)
     print(f"✅ Loaded IP-to-country data: shape = {df.shape}")
 
     # Convert IP bounds to integers
+    ip_dtype = 'uint32' if compact else int
     print("⏳ Converting 'lower_bound_ip_address' and 'upper_bound_ip_address' to integers...")
-    df['lower_bound_ip_address'] = df['lower_bound_ip_address'].astype(int)
-    df['upper_bound_ip_address'] = df['upper_bound_ip_address'].astype(int)
+    df['lower_bound_ip_address'] = df['lower_bound_ip_address'].astype(ip_dtype)
+    df['upper_bound_ip_address'] = df['upper_bound_ip_address'].astype(ip_dtype)
     print("✅ IP bounds converted to integers.")
+    if compact:
+        report_memory("IP-to-country data", df)
 
     return df
 
@@ -100,11 +193,17 @@ def merge_ip_with_country(fraud_df: pd.DataFrame, ip_df: pd.DataFrame) -> pd.Dat
     """
     print("🌐 Starting IP-to-country merge using range-based lookup...")
 
-    # Convert IP addresses to integers
-    print("⏳ Converting fraud data IP addresses to integers...")
+    # Convert IP addresses to integers (compact frames already carry a uint32 ip_int)
     fraud_df = fraud_df.copy()
-    fraud_df['ip_int'] = fraud_df['ip_address'].apply(ip_to_int)
-    print(f"✅ Created 'ip_int' column. Sample: {fraud_df['ip_int'].head(3).tolist()}")
+    if 'ip_address' in fraud_df.columns:
+        print("⏳ Converting fraud data IP addresses to integers...")
+        fraud_df['ip_int'] = fraud_df['ip_address'].apply(ip_to_int)
+        print(f"✅ Created 'ip_int' column. Sample: {fraud_df['ip_int'].head(3).tolist()}")
+
+    # merge_asof needs both keys in the same dtype
+    if fraud_df['ip_int'].dtype != ip_df['lower_bound_ip_address'].dtype:
+        fraud_df['ip_int'] = fraud_df['ip_int'].astype('int64')
+        ip_df = ip_df.astype({'lower_bound_ip_address': 'int64', 'upper_bound_ip_address': 'int64'})
 
     # Sort data for merge_asof
     print("⏳ Sorting fraud and IP-country data for efficient merge...")
@@ -129,6 +228,8 @@ def merge_ip_with_country(fraud_df: pd.DataFrame, ip_df: pd.DataFrame) -> pd.Dat
 
     # Rename and report
     merged.rename(columns={'country': 'transaction_country'}, inplace=True)
+    if isinstance(ip_df['country'].dtype, pd.CategoricalDtype):
+        merged['transaction_country'] = merged['transaction_country'].cat.remove_unused_categories()
     print("✅ IP-to-country merge completed.")
     
     # Report coverage
@@ -149,9 +250,10 @@ if __name__ == "__main__":
     fraud_path = os.path.join(base, 'Data', 'Fraud_Data.csv')
     ip_path = os.path.join(base, 'Data', 'IpAddress_to_Country.csv')
     out_path = os.path.join(base, 'Data', 'merged_data.csv')
+    compact = '--compact' in sys.argv
 
-    fraud_df = load_fraud_data(fraud_path)
-    ip_df = load_ip_country_data(ip_path)
+    fraud_df = load_fraud_data(fraud_path, compact=compact)
+    ip_df = load_ip_country_data(ip_path, compact=compact)
     fraud_enriched = merge_ip_with_country(fraud_df, ip_df)
     fraud_enriched.to_csv(out_path, index=False)
     print(f"✅ Enriched fraud data saved to: {out_path}")
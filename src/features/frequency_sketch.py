@@ -0,0 +1,311 @@
+# src/features/frequency_sketch.py
+"""
+Approximate frequency encoding with count-min sketches.
+
+An exact value_counts() dict for device_id / ip_address grows with the number
+of distinct values (millions) and is never shipped to the API. A count-min
+sketch answers "how often has this value been seen" in fixed memory:
+
+    width = ceil(e / epsilon), depth = ceil(ln(1 / delta))
+
+Estimates never undercount, and overcount by at most epsilon * N (N = total
+values added) with probability 1 - delta.
+
+Values are hashed with pandas' stable hash_array (not Python's salted hash()),
+so sketches built at training time give the same answers in the API process.
+Each value's `depth` bucket indices come from one 64-bit hash via double hashing.
+IP addresses are counted by their integer value, so the float-encoded IPs of
+the training CSV and the dotted strings sent to the API share one key; the
+integers are hashed as numbers. Other values are hashed as text, once per
+distinct value of a batch (pyarrow arrays are dictionary-encoded first).
+
+Under the prefork server (serve.py) the tables are moved to shared memory
+before forking (share()), so every worker counts into the same sketches.
+
+Build from a CSV in one streaming pass (run from project root):
+    python -m src.features.frequency_sketch Data/Fraud_Data.csv
+"""
+import math
+import sys
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.helpers import ips_to_int
+
+DEFAULT_COLUMNS = ["device_id", "browser", "source", "ip_address"]
+DEFAULT_SKETCH_PATH = "models/frequency_sketches.npz"
+HASH_KEY = "fraudfreqsketch0"  # 16 bytes, fixed so hashes are stable across runs
+KEY_FORMAT = 3  # 3: ip_address hashed as an integer (2: integer as text, 1: raw text)
+
+
+class CountMinSketch:
+    def __init__(self, epsilon: float = 1e-4, delta: float = 1e-3, table=None, total: int = 0):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = np.zeros((self.depth, self.width), dtype=np.uint32) if table is None else table
+        self._total = [total]  # one-element container so it can be moved to shared memory
+
+    @property
+    def total(self) -> int:
+        return int(self._total[0])
+
+    def _indices(self, values) -> np.ndarray:
+        """
+        (depth, n) bucket indices for an array of values: integers are hashed
+        as numbers, anything else as text
+        """
+        values = np.asarray(values)
+        if values.dtype.kind in "iu":
+            values = values.astype(np.uint64)
+        else:
+            values = pd.Series(values, dtype=object).astype(str).to_numpy(dtype=object)
+        h = pd.util.hash_array(values, hash_key=HASH_KEY, categorize=True)
+        h1 = h & np.uint64(0xFFFFFFFF)
+        h2 = (h >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def _add(self, idx, codes=None) -> None:
+        weights = None if codes is None else np.bincount(codes, minlength=idx.shape[1])
+        for row in range(self.depth):
+            self.table[row] += np.bincount(idx[row], weights, minlength=self.width).astype(np.uint32)
+        self._total[0] += idx.shape[1] if codes is None else len(codes)
+
+    def _query(self, idx, codes=None) -> np.ndarray:
+        counts = self.table[np.arange(self.depth)[:, None], idx].min(axis=0)
+        return counts if codes is None else counts[codes]
+
+    def add(self, values, codes=None) -> None:
+        """
+        Count values, or with codes, count values[codes] (each distinct value
+        is hashed once)
+        """
+        self._add(self._indices(values), codes)
+
+    def query(self, values, codes=None) -> np.ndarray:
+        return self._query(self._indices(values), codes)
+
+    def query_and_add(self, values, codes=None) -> np.ndarray:
+        """
+        Counts before adding, then add; hashes the values once
+        """
+        idx = self._indices(values)
+        counts = self._query(idx, codes)
+        self._add(idx, codes)
+        return counts
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    @property
+    def error_bound(self) -> float:
+        """
+        Max overcount (w.p. 1 - delta) at the current total
+        """
+        return self.epsilon * self.total
+
+
+class FrequencySketchEncoder:
+    """
+    Frequency encoder backed by one count-min sketch per column. Adds
+    `<col>_freq` columns like the exact value_counts() mapping in Train.py.
+    """
+
+    def __init__(self, columns: Iterable[str] = DEFAULT_COLUMNS, epsilon: float = 1e-4, delta: float = 1e-3):
+        self.columns = list(columns)
+        self.epsilon = epsilon
+        self.delta = delta
+        self.sketches: Dict[str, CountMinSketch] = {c: CountMinSketch(epsilon, delta) for c in self.columns}
+        self._lock = threading.Lock()
+
+    def partial_fit(self, df: pd.DataFrame) -> "FrequencySketchEncoder":
+        """
+        Add one chunk of rows; call repeatedly to stream a large file
+        """
+        with self._lock:
+            for col in self.columns:
+                if col in df.columns:
+                    self.sketches[col].add(*column_keys(col, df[col].dropna()))
+        return self
+
+    def fit(self, df: pd.DataFrame) -> "FrequencySketchEncoder":
+        return self.partial_fit(df)
+
+    def fit_csv(self, path: str, chunksize: int = 500_000) -> "FrequencySketchEncoder":
+        """
+        Build the sketches in one streaming pass over a CSV
+        """
+        present = pd.read_csv(path, nrows=0).columns
+        usecols = [c for c in self.columns if c in present]
+        for chunk in pd.read_csv(path, usecols=usecols, dtype=str, chunksize=chunksize):
+            self.partial_fit(chunk)
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        for col in self.columns:
+            if col in df.columns:
+                df[f"{col}_freq"] = self.sketches[col].query(*column_keys(col, df[col].fillna("")))
+        return df
+
+    def update_and_query(self, record: dict) -> Dict[str, int]:
+        """
+        Serving path: count one transaction's values, return its `<col>_freq` features
+        """
+        features = {}
+        with self._lock:
+            for col in self.columns:
+                if col in record and record[col] is not None:
+                    sketch = self.sketches[col]
+                    key, _ = column_keys(col, [record[col]])
+                    sketch.add(key)
+                    features[f"{col}_freq"] = int(sketch.query(key)[0])
+        return features
+
+    def update_and_query_columns(self, columns: dict) -> Dict[str, np.ndarray]:
+        """
+        Batch version of update_and_query for column arrays. Each row sees the
+        counts before the batch plus the occurrences of its value up to and
+        including itself, as if the rows had been added one at a time.
+        """
+        features = {}
+        with self._lock:
+            for col in self.columns:
+                if col not in columns:
+                    continue
+                keys, codes = column_keys(col, columns[col])
+                sketch = self.sketches[col]
+                before = sketch.query_and_add(keys, codes)
+                running = pd.Series(codes).groupby(codes, sort=False).cumcount().to_numpy() + 1
+                features[f"{col}_freq"] = before.astype(np.int64) + running
+        return features
+
+    def query_columns(self, columns: dict) -> Dict[str, np.ndarray]:
+        """
+        Read-only version of update_and_query_columns
+        """
+        return {f"{col}_freq": self.sketches[col].query(*column_keys(col, columns[col])).astype(np.int64)
+                for col in self.columns if col in columns}
+
+    def query(self, record: dict) -> Dict[str, int]:
+        """
+        Read-only version of update_and_query
+        """
+        return {f"{col}_freq": int(self.sketches[col].query(column_keys(col, [record[col]])[0])[0])
+                for col in self.columns if record.get(col) is not None}
+
+    def share(self) -> None:
+        """
+        Move the count tables to memory shared with processes forked afterwards,
+        so all workers count into the same sketches and the online counts
+        survive worker recycling. A full restart reloads the saved sketches.
+        """
+        from src.utils.shared import share_copy
+
+        with self._lock:
+            for sketch in self.sketches.values():
+                sketch.table = share_copy(sketch.table)
+                sketch._total = share_copy(sketch._total, "int64")
+
+    @property
+    def nbytes(self) -> int:
+        return sum(s.nbytes for s in self.sketches.values())
+
+    def save(self, path: str = DEFAULT_SKETCH_PATH) -> None:
+        arrays = {f"table__{c}": s.table for c, s in self.sketches.items()}
+        arrays["totals"] = np.array([self.sketches[c].total for c in self.columns], dtype=np.int64)
+        arrays["columns"] = np.array(self.columns)
+        arrays["params"] = np.array([self.epsilon, self.delta])
+        arrays["key_format"] = np.array(KEY_FORMAT)
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_SKETCH_PATH) -> "FrequencySketchEncoder":
+        with np.load(path, allow_pickle=False) as data:
+            epsilon, delta = data["params"].tolist()
+            key_format = int(data["key_format"]) if "key_format" in data.files else 1
+            if key_format != KEY_FORMAT and "ip_address" in data["columns"].tolist():
+                raise ValueError(f"{path} uses an older ip_address key format; rebuild it with "
+                                 f"python -m src.features.frequency_sketch")
+            encoder = cls(data["columns"].tolist(), epsilon, delta)
+            for col, total in zip(encoder.columns, data["totals"].tolist()):
+                encoder.sketches[col] = CountMinSketch(epsilon, delta, table=data[f"table__{col}"].copy(), total=total)
+        return encoder
+
+
+def column_keys(col: str, values) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (keys, codes) for a column (list, numpy, pandas or pyarrow): the distinct
+    sketch keys, and per row the position of its key, so keys[codes] are the
+    row keys. ip_address is keyed by its integer value, whether given dotted
+    or as a number; other values by their text. pyarrow arrays are
+    dictionary-encoded on their buffers, so Python strings are only built for
+    distinct values.
+    """
+    if col == "ip_address":
+        codes, keys = pd.factorize(ips_to_int(values))
+        return keys, codes
+
+    row_codes = None
+    if hasattr(values, "type"):  # pyarrow
+        values = values.combine_chunks() if hasattr(values, "combine_chunks") else values
+        values = values.dictionary_decode() if hasattr(values, "dictionary_decode") else values
+        encoded = values.dictionary_encode(null_encoding="encode")
+        row_codes = encoded.indices.to_numpy()
+        values = encoded.dictionary.to_numpy(zero_copy_only=False)
+    elif hasattr(values, "to_numpy"):  # pandas
+        values = values.to_numpy()
+    codes, keys = pd.factorize(pd.Series(values, dtype=object).astype(str).to_numpy(dtype=object))
+    return keys, (codes if row_codes is None else codes[row_codes])
+
+
+def exact_dict_nbytes(freq_map: dict) -> int:
+    """
+    Approximate memory of a value -> count dict (container + keys + values)
+    """
+    return sys.getsizeof(freq_map) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in freq_map.items())
+
+
+def compare_to_exact(df: pd.DataFrame, encoder: FrequencySketchEncoder) -> List[dict]:
+    """
+    Accuracy and memory of the sketches against exact value_counts() maps
+    """
+    rows = []
+    for col in encoder.columns:
+        if col not in df.columns:
+            continue
+        values = df[col].dropna().astype(str)
+        exact = values.value_counts()
+        estimate = encoder.sketches[col].query(*column_keys(col, exact.index.to_numpy()))
+        error = estimate.astype(np.int64) - exact.to_numpy()
+        rows.append({
+            "column": col,
+            "distinct": len(exact),
+            "exact_kb": exact_dict_nbytes(exact.to_dict()) / 1024,
+            "sketch_kb": encoder.sketches[col].nbytes / 1024,
+            "mean_abs_error": float(np.abs(error).mean()),
+            "max_error": int(error.max()),
+            "error_bound": encoder.sketches[col].error_bound,
+            "exact_share": float((error == 0).mean()),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    data_path = sys.argv[1] if len(sys.argv) > 1 else "Data/Fraud_Data.csv"
+    out_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_SKETCH_PATH
+
+    print(f"🔍 Building frequency sketches from {data_path}...")
+    encoder = FrequencySketchEncoder().fit_csv(data_path)
+    encoder.save(out_path)
+    print(f"✅ Saved frequency sketches to {out_path} ({encoder.nbytes / 1024:.1f} KB)")
+
+    df = pd.read_csv(data_path, usecols=lambda c: c in encoder.columns, dtype=str)
+    print(pd.DataFrame(compare_to_exact(df, encoder)).to_string(index=False))
@@ -13,6 +13,11 @@ from imblearn.over_sampling import SMOTE
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from src.monitoring.drift import build_reference_profile, save_reference_profile  # noqa: E402
+from src.features.frequency_sketch import FrequencySketchEncoder  # noqa: E402
+from src.models.cascade import build_cascade  # noqa: E402
 
 # =====================
 # 1. Load Data
@@ -31,11 +36,16 @@ if "signup_time" in df.columns and "purchase_time" in df.columns:
     df["signup_to_purchase_secs"] = (df["purchase_time"] - df["signup_time"]).dt.total_seconds()
     df["signup_to_purchase_secs"].fillna(0, inplace=True)
 
-# Frequency encoding for device_id, browser, source (if exist)
-for col in ["device_id", "browser", "source", "ip_address"]:
-    if col in df.columns:
-        freq_map = df[col].value_counts().to_dict()
-        df[f"{col}_freq"] = df[col].map(freq_map)
+# Frequency encoding for device_id, browser, source, ip_address (if exist)
+# Count-min sketches instead of exact value_counts() dicts: fixed memory at
+# any cardinality, and saved so the API can compute the same features
+freq_cols = [c for c in ["device_id", "browser", "source", "ip_address"] if c in df.columns]
+if freq_cols:
+    freq_encoder = FrequencySketchEncoder(columns=freq_cols).fit(df)
+    df = freq_encoder.transform(df)
+    os.makedirs("models", exist_ok=True)
+    freq_encoder.save("models/frequency_sketches.npz")
+    print(f"✅ Saved frequency sketches ({freq_encoder.nbytes / 1024:.1f} KB) at models/frequency_sketches.npz")
 
 # =====================
 # 3. Features/Target
@@ -107,6 +117,41 @@ best_model = joblib.load(f"models/{best_model_name}.pkl")
 y_pred_best = best_model.predict(X_test)
 cm = confusion_matrix(y_test, y_pred_best)
 
+# =====================
+# 7. Cascade Calibration (LogisticRegression -> XGBoost)
+# =====================
+# Band around the 0.2 API threshold where the cheap model defers to XGBoost,
+# chosen on the held-out set to cost at most 0.5pt recall / 1pt precision.
+# Stage-1 probabilities are recalibrated onto XGBoost's scale first.
+# This cascade is over the credit card features (benchmarks/cascade_benchmark.py);
+# the API's cascade is built for the served model by src/models/build_cascade.py
+FRAUD_THRESHOLD = 0.2
+p_heavy_test = models["XGBoost"].predict_proba(X_test)[:, 1]
+cascade, cascade_scores = build_cascade(
+    X.columns.tolist(), scaler, models["LogisticRegression"], scaler.inverse_transform(X_test), p_heavy_test,
+    y_test, threshold=FRAUD_THRESHOLD, max_recall_loss=0.005, max_precision_loss=0.01
+)
+band = cascade.calibration
+cascade.save("models/creditcard_cascade.json")
+print(f"✅ Saved cascade at models/creditcard_cascade.json: band [{band['low']:.4f}, {band['high']:.4f}), "
+      f"stage 1 answers {band['fast_share']:.1%}, recall {band['heavy_recall']:.4f} -> {band['cascade_recall']:.4f}")
+
+# =====================
+# 8. Reference Profile for Drift Monitoring
+# =====================
+# Raw (unscaled) feature distributions and the score distribution of XGBoost,
+# the served full model (whichever model won on PR-AUC above), compared
+# against served traffic by the API's drift monitor, plus the cascade's
+# output distribution for when the cascade answers
+numeric_cols = X.select_dtypes(include="number").columns.tolist()
+categorical_cols = [c for c in ["browser", "source", "sex", "country", "transaction_country"] if c in df.columns]
+profile = build_reference_profile(
+    df, numeric_columns=numeric_cols, categorical_columns=categorical_cols,
+    scores=p_heavy_test, cascade_scores=cascade_scores
+)
+save_reference_profile(profile, "models/reference_profile.json")
+print("✅ Saved drift reference profile at models/reference_profile.json")
+
 plt.figure(figsize=(6,5))
 sns.heatmap(cm, annot=True, fmt="d", cmap="Blues", xticklabels=["Genuine", "Fraud"], yticklabels=["Genuine", "Fraud"])
 plt.title(f"Confusion Matrix - {best_model_name}")
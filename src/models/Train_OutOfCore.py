@@ -0,0 +1,369 @@
+# src/models/Train_OutOfCore.py
+"""
+Out-of-core training for datasets larger than RAM.
+
+Train.py holds the full CSV, a scaled copy and a SMOTE-inflated copy in memory
+at once. This script never materializes the dataset:
+
+  Pass 1 (one streaming read of the CSV, in chunks):
+    - rows are split train/test with a seeded per-row draw (~stratified)
+    - StandardScaler.partial_fit on the train rows
+    - class counts; negatives are optionally down-sampled with rate r and
+      kept negatives get weight 1/r (replaces SMOTE)
+    - raw float32 rows are appended to on-disk train/test files
+  Pass 2 (models read the disk files chunk by chunk, scaling on the fly):
+    - LogisticRegression equivalent: SGDClassifier(log_loss).partial_fit
+    - XGBoost: xgb.DataIter + external-memory DMatrix (cache on disk)
+    - LightGBM: lgb.Sequence over the memory-mapped train file
+  Positives are up-weighted with scale_pos_weight = weighted neg / pos.
+
+Peak RSS is reported after each stage. --compare also runs the in-memory
+path (full load + scaler + SMOTE + XGBoost) in a child process and prints
+both sets of metrics and peak RSS side by side.
+
+Usage (from project root):
+    python src/models/Train_OutOfCore.py --data Data/creditcard.csv --chunksize 100000 --compare
+"""
+import argparse
+import importlib.util
+import os
+import resource
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import auc, precision_recall_curve, roc_auc_score
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+# "load&merge.py" is not a valid module name, so load it by path for CREDIT_SCHEMA
+_spec = importlib.util.spec_from_file_location(
+    "load_merge", os.path.join(os.path.dirname(__file__), '..', 'data_input', 'load&merge.py'))
+load_merge = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(load_merge)
+
+TARGET_COLUMNS = ["Class", "class"]
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is in kB on Linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def report(stage: str) -> None:
+    print(f"📈 Peak RSS after {stage}: {peak_rss_mb():.1f} MB")
+
+
+def evaluate(y_true, y_prob) -> dict:
+    precision, recall, _ = precision_recall_curve(y_true, y_prob)
+    return {"roc_auc": roc_auc_score(y_true, y_prob), "pr_auc": auc(recall, precision)}
+
+
+# =====================
+# Pass 1: stream the CSV to disk
+# =====================
+class ChunkedDataset:
+    """
+    Train/test rows stored as raw float32 files on disk, read back through memmaps
+    """
+
+    def __init__(self, workdir: str):
+        self.workdir = workdir
+        self.paths = {f"{split}_{kind}": os.path.join(workdir, f"{split}_{kind}.bin")
+                      for split in ("train", "test") for kind in ("X", "y", "w")}
+        self.n_features = 0
+        self.feature_columns = []
+        self.scaler = StandardScaler()
+        self.class_counts = {0: 0, 1: 0}
+        self.rows = {"train": 0, "test": 0}
+
+    def build(self, path: str, chunksize: int, test_size: float, neg_sample_rate: float, seed: int):
+        rng = np.random.default_rng(seed)
+        columns = pd.read_csv(path, nrows=0).columns
+        target = next(c for c in TARGET_COLUMNS if c in columns)
+        schema = {c: load_merge.CREDIT_SCHEMA.get(c, "float32") for c in columns}
+        schema[target] = "int8"
+
+        files = {key: open(p, "wb") for key, p in self.paths.items()}
+        try:
+            for chunk in pd.read_csv(path, dtype=schema, chunksize=chunksize):
+                y = chunk[target].to_numpy(dtype=np.float32)
+                X = chunk.drop(columns=[target]).fillna(0).to_numpy(dtype=np.float32)
+                self.feature_columns = [c for c in chunk.columns if c != target]
+
+                is_test = rng.random(len(chunk)) < test_size
+                X_train, y_train = X[~is_test], y[~is_test]
+
+                # Class-aware sampling: keep every positive, a fraction of negatives
+                keep = (y_train == 1) | (rng.random(len(y_train)) < neg_sample_rate)
+                X_train, y_train = X_train[keep], y_train[keep]
+                w_train = np.where(y_train == 1, 1.0, 1.0 / neg_sample_rate).astype(np.float32)
+
+                if len(X_train):
+                    self.scaler.partial_fit(X_train, sample_weight=w_train)
+                self.class_counts[1] += int(y_train.sum())
+                self.class_counts[0] += float(w_train[y_train == 0].sum())
+
+                for split, (Xs, ys, ws) in {
+                    "train": (X_train, y_train, w_train),
+                    "test": (X[is_test], y[is_test], np.ones(int(is_test.sum()), dtype=np.float32)),
+                }.items():
+                    Xs.tofile(files[f"{split}_X"])
+                    ys.tofile(files[f"{split}_y"])
+                    ws.tofile(files[f"{split}_w"])
+                    self.rows[split] += len(ys)
+        finally:
+            for f in files.values():
+                f.close()
+
+        self.n_features = len(self.feature_columns)
+        return self
+
+    def memmap(self, split: str, kind: str):
+        shape = (self.rows[split], self.n_features) if kind == "X" else (self.rows[split],)
+        return np.memmap(self.paths[f"{split}_{kind}"], dtype=np.float32, mode="r", shape=shape)
+
+    def iter_chunks(self, split: str, chunksize: int):
+        """
+        Yield scaled (X, y, w) chunks from disk
+        """
+        X, y, w = self.memmap(split, "X"), self.memmap(split, "y"), self.memmap(split, "w")
+        for start in range(0, self.rows[split], chunksize):
+            stop = start + chunksize
+            yield self.scaler.transform(np.asarray(X[start:stop])).astype(np.float32), \
+                np.asarray(y[start:stop]), np.asarray(w[start:stop])
+
+    @property
+    def scale_pos_weight(self) -> float:
+        return self.class_counts[0] / max(self.class_counts[1], 1)
+
+
+# =====================
+# Pass 2: models over chunks
+# =====================
+def train_sgd(data: ChunkedDataset, chunksize: int, epochs: int = 3):
+    model = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=42)
+    pos_weight = data.scale_pos_weight
+    for _ in range(epochs):
+        for X, y, w in data.iter_chunks("train", chunksize):
+            model.partial_fit(X, y, classes=np.array([0.0, 1.0]), sample_weight=w * np.where(y == 1, pos_weight, 1.0))
+    return model
+
+
+def train_xgboost(data: ChunkedDataset, chunksize: int, cache_dir: str):
+    import xgboost as xgb
+
+    class ChunkIter(xgb.DataIter):
+        def __init__(self):
+            self._it = None
+            super().__init__(cache_prefix=os.path.join(cache_dir, "xgb_cache"))
+
+        def next(self, input_data):
+            if self._it is None:
+                self._it = data.iter_chunks("train", chunksize)
+            try:
+                X, y, w = next(self._it)
+            except StopIteration:
+                return 0
+            input_data(data=X, label=y, weight=w)
+            return 1
+
+        def reset(self):
+            self._it = None
+
+    dtrain = xgb.DMatrix(ChunkIter())  # external memory: pages cached on disk
+    params = {
+        "objective": "binary:logistic",
+        "eval_metric": "logloss",
+        "tree_method": "hist",
+        "scale_pos_weight": data.scale_pos_weight,
+        "seed": 42,
+    }
+    return xgb.train(params, dtrain, num_boost_round=200)
+
+
+def train_lightgbm(data: ChunkedDataset, chunksize: int):
+    import lightgbm as lgb
+
+    class MemmapSequence(lgb.Sequence):
+        def __init__(self):
+            self.X = data.memmap("train", "X")
+            self.batch_size = chunksize
+
+        def __getitem__(self, idx):
+            # LightGBM only accepts float64 rows from a Sequence
+            rows = np.asarray(self.X[idx])
+            return data.scaler.transform(rows.reshape(-1, data.n_features)).reshape(rows.shape).astype(np.float64)
+
+        def __len__(self):
+            return len(self.X)
+
+    dtrain = lgb.Dataset(
+        [MemmapSequence()],
+        label=np.asarray(data.memmap("train", "y")),
+        weight=np.asarray(data.memmap("train", "w")),
+        feature_name=data.feature_columns,
+    )
+    params = {"objective": "binary", "scale_pos_weight": data.scale_pos_weight, "seed": 42, "verbose": -1}
+    return lgb.train(params, dtrain, num_boost_round=100)
+
+
+def predict_test(data: ChunkedDataset, chunksize: int, predict):
+    probs, labels = [], []
+    for X, y, _ in data.iter_chunks("test", chunksize):
+        probs.append(predict(X))
+        labels.append(y)
+    return np.concatenate(labels), np.concatenate(probs)
+
+
+def train_model(name: str, data: ChunkedDataset, chunksize: int, workdir: str):
+    """
+    Train one model out-of-core, return (model, test metrics)
+    """
+    if name == "LogisticRegression":
+        model = train_sgd(data, chunksize)
+
+        def predict(X):
+            return model.predict_proba(X)[:, 1]
+    elif name == "XGBoost":
+        import xgboost as xgb
+        model = train_xgboost(data, chunksize, workdir)
+
+        def predict(X):
+            return model.predict(xgb.DMatrix(X))
+    elif name == "LightGBM":
+        model = train_lightgbm(data, chunksize)
+        predict = model.predict
+    else:
+        raise ValueError(f"Unknown model: {name}")
+
+    y_test, y_prob = predict_test(data, chunksize, predict)
+    return model, evaluate(y_test, y_prob)
+
+
+# =====================
+# In-memory baseline (Train.py path), run in a child process
+# =====================
+def _in_memory_xgboost(path: str, conn):
+    from imblearn.over_sampling import SMOTE
+    from sklearn.model_selection import train_test_split
+    from xgboost import XGBClassifier
+
+    df = pd.read_csv(path)
+    target = next(c for c in TARGET_COLUMNS if c in df.columns)
+    y = df[target]
+    X = StandardScaler().fit_transform(df.drop(columns=[target]).fillna(0))
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    X_res, y_res = SMOTE(random_state=42).fit_resample(X_train, y_train)
+    model = XGBClassifier(tree_method="hist", eval_metric="logloss", n_estimators=200, random_state=42)
+    model.fit(X_res, y_res)
+    conn.send(evaluate(y_test, model.predict_proba(X_test)[:, 1]))
+    conn.close()
+
+
+def run_in_memory_baseline(path: str):
+    """
+    Run the in-memory path in a forked child and return its metrics.
+    Raises RuntimeError if the child dies (OOM kill, missing imblearn, ...).
+    """
+    import multiprocessing as mp
+
+    ctx = mp.get_context("fork")
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_in_memory_xgboost, args=(path, child))
+    proc.start()
+    # Only the child holds the write end now, so its death shows up as EOF
+    child.close()
+    metrics = None
+    try:
+        while not parent.poll(1.0):
+            if not proc.is_alive():
+                break
+        if parent.poll():
+            metrics = parent.recv()
+    except EOFError:
+        pass
+    finally:
+        parent.close()
+    proc.join()
+
+    if metrics is None or proc.exitcode != 0:
+        if proc.exitcode is not None and proc.exitcode < 0:
+            reason = f"killed by signal {-proc.exitcode} (out of memory?)"
+        else:
+            reason = f"exit code {proc.exitcode}"
+        raise RuntimeError(f"In-memory baseline failed: {reason}")
+    # RUSAGE_CHILDREN is the largest peak among reaped children
+    metrics["peak_rss_mb"] = peak_rss_mb(resource.RUSAGE_CHILDREN)
+    return metrics
+
+
+def sample_rate(value: str) -> float:
+    """
+    argparse type for --neg-sample-rate: a fraction in (0, 1]
+    """
+    try:
+        rate = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number: {value!r}")
+    if not 0 < rate <= 1:
+        raise argparse.ArgumentTypeError(f"must be in (0, 1], got {value}")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Out-of-core fraud model training")
+    parser.add_argument("--data", default="Data/creditcard.csv")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--neg-sample-rate", type=sample_rate, default=1.0,
+                        help="Fraction of negatives kept for training (weighted back up by 1/rate)")
+    parser.add_argument("--models", default="LogisticRegression,XGBoost,LightGBM")
+    parser.add_argument("--workdir", default=None, help="Scratch directory for on-disk chunks (default: temp dir)")
+    parser.add_argument("--compare", action="store_true", help="Also run the in-memory SMOTE + XGBoost path")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        # Run first so the child is forked before this process grows
+        print("⏳ Running in-memory baseline in a child process...")
+        try:
+            baseline = run_in_memory_baseline(args.data)
+        except RuntimeError as e:
+            print(f"❌ {e}; continuing without the comparison")
+
+    os.makedirs("models", exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        print(f"🔍 Streaming {args.data} in chunks of {args.chunksize:,} rows...")
+        data = ChunkedDataset(workdir).build(args.data, args.chunksize, args.test_size, args.neg_sample_rate, seed=42)
+        print(f"✅ Train rows: {data.rows['train']:,} | Test rows: {data.rows['test']:,} | "
+              f"scale_pos_weight: {data.scale_pos_weight:.1f}")
+        report("streaming pass")
+        joblib.dump(data.scaler, "models/scaler_ooc.pkl")
+
+        results = {}
+        for name in args.models.split(","):
+            print(f"\n🔹 Training {name} out-of-core...")
+            model, results[name] = train_model(name, data, args.chunksize, workdir)
+            print(f"ROC-AUC: {results[name]['roc_auc']:.4f} | PR-AUC: {results[name]['pr_auc']:.4f}")
+            report(name)
+
+            joblib.dump(model, f"models/{name}_ooc.pkl")
+            print(f"✅ Saved {name} model at models/{name}_ooc.pkl")
+
+    print(f"\n📈 Out-of-core peak RSS: {peak_rss_mb():.1f} MB")
+    if baseline is not None:
+        print(f"{'path':<22} {'ROC-AUC':>8} {'PR-AUC':>8} {'peak RSS':>10}")
+        print(f"{'in-memory XGBoost':<22} {baseline['roc_auc']:>8.4f} {baseline['pr_auc']:>8.4f} "
+              f"{baseline['peak_rss_mb']:>8.1f}MB")
+        if "XGBoost" in results:
+            print(f"{'out-of-core XGBoost':<22} {results['XGBoost']['roc_auc']:>8.4f} "
+                  f"{results['XGBoost']['pr_auc']:>8.4f} {peak_rss_mb():>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
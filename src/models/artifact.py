@@ -0,0 +1,165 @@
+# src/models/artifact.py
+"""
+Compact, pickle-free serving artifact for the fraud model.
+
+Unpickling the full sklearn pipeline pulls in sklearn, joblib and every class
+the pipeline references, which dominates API cold start. The artifact keeps
+only what scoring needs, in a single .npz loaded with allow_pickle=False:
+
+    booster       uint8    XGBoost model serialized as UBJSON
+    scaler_mean   float64  StandardScaler.mean_   (if the pipeline scales)
+    scaler_scale  float64  StandardScaler.scale_  (if the pipeline scales)
+    meta          uint8    UTF-8 JSON: artifact version, feature_columns,
+                           encoder classes and the scalar model_info entries
+
+Export from the pickled pipeline (run from project root):
+    python -m src.models.artifact
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+ARTIFACT_VERSION = 1
+DEFAULT_ARTIFACT_PATH = "models/ecommerce_model.npz"
+
+
+class CompactLabelEncoder:
+    """
+    Dict-backed stand-in for a fitted LabelEncoder (transform only)
+    """
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+        self._index = {c: i for i, c in enumerate(self.classes_.tolist())}
+
+    def transform(self, values):
+        try:
+            return np.array([self._index[v] for v in values], dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"y contains previously unseen labels: {e.args[0]!r}") from None
+
+
+class CompactPipeline:
+    """
+    StandardScaler + XGBoost booster with the predict_proba interface of the
+    original pipeline
+    """
+
+    def __init__(self, booster, scaler_mean=None, scaler_scale=None):
+        self.booster = booster
+        self.scaler_mean = scaler_mean
+        self.scaler_scale = scaler_scale
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if self.scaler_mean is not None:
+            X = X - self.scaler_mean
+        if self.scaler_scale is not None:
+            X = X / self.scaler_scale
+        fraud_prob = self.booster.inplace_predict(X)
+        return np.column_stack([1.0 - fraud_prob, fraud_prob])
+
+
+def _split_pipeline(pipeline):
+    """
+    Return (scaler or None, fitted XGBClassifier) from a (possibly imblearn) pipeline
+    """
+    steps = list(pipeline.named_steps.values()) if hasattr(pipeline, "named_steps") else [pipeline]
+    model, transforms = steps[-1], steps[:-1]
+
+    # Resamplers (SMOTE, ...) only act during fit
+    transforms = [step for step in transforms if step not in (None, "passthrough") and not hasattr(step, "fit_resample")]
+    if len(transforms) > 1 or (transforms and not hasattr(transforms[0], "scale_")):
+        raise ValueError(f"Unsupported pipeline steps for compact export: {transforms}")
+    if not hasattr(model, "get_booster"):
+        raise ValueError(f"Final pipeline step must be an XGBoost model, got {type(model).__name__}")
+
+    return (transforms[0] if transforms else None), model
+
+
+def _to_json(value):
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def export_artifact(pipeline, model_info: dict, path: str = DEFAULT_ARTIFACT_PATH) -> str:
+    """
+    Write the compact artifact for a fitted pipeline and its model_info dict
+    """
+    scaler, model = _split_pipeline(pipeline)
+
+    meta = {"version": ARTIFACT_VERSION}
+    for key, value in model_info.items():
+        if key == "encoders":
+            meta["encoders"] = {name: enc.classes_.tolist() for name, enc in value.items()}
+        else:
+            try:
+                json.dumps(value, default=_to_json)
+            except TypeError:
+                print(f"⚠️  Skipping non-serializable model_info entry: {key}")
+                continue
+            meta[key] = value
+
+    arrays = {
+        "booster": np.frombuffer(bytes(model.get_booster().save_raw(raw_format="ubj")), dtype=np.uint8),
+        "meta": np.frombuffer(json.dumps(meta, default=_to_json).encode("utf-8"), dtype=np.uint8),
+    }
+    if scaler is not None:
+        if getattr(scaler, "mean_", None) is not None:
+            arrays["scaler_mean"] = np.asarray(scaler.mean_, dtype=np.float64)
+        if getattr(scaler, "scale_", None) is not None:
+            arrays["scaler_scale"] = np.asarray(scaler.scale_, dtype=np.float64)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+    return path
+
+
+def load_artifact(path: str = DEFAULT_ARTIFACT_PATH):
+    """
+    Load (pipeline, model_info) from a compact artifact
+    """
+    import xgboost as xgb
+
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+        if meta.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported artifact version {meta.get('version')} in {path}")
+
+        booster = xgb.Booster()
+        booster.load_model(bytearray(data["booster"].tobytes()))
+        pipeline = CompactPipeline(
+            booster,
+            scaler_mean=data["scaler_mean"] if "scaler_mean" in data.files else None,
+            scaler_scale=data["scaler_scale"] if "scaler_scale" in data.files else None,
+        )
+
+    model_info = {k: v for k, v in meta.items() if k != "version"}
+    model_info["encoders"] = {name: CompactLabelEncoder(classes) for name, classes in meta.get("encoders", {}).items()}
+    return pipeline, model_info
+
+
+if __name__ == "__main__":
+    import joblib
+    import pandas as pd
+
+    pipeline_path = sys.argv[1] if len(sys.argv) > 1 else "models/XGBoost_ecommerce_pipeline.pkl"
+    info_path = sys.argv[2] if len(sys.argv) > 2 else "models/ecommerce_model_info.pkl"
+    out_path = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_ARTIFACT_PATH
+
+    pipeline = joblib.load(pipeline_path)
+    model_info = joblib.load(info_path)
+    export_artifact(pipeline, model_info, out_path)
+    print(f"✅ Compact artifact saved to: {out_path} ({os.path.getsize(out_path) / 1024:.1f} KB, "
+          f"pickle: {os.path.getsize(pipeline_path) / 1024:.1f} KB)")
+
+    # Check the artifact scores exactly like the pickled pipeline
+    compact, _ = load_artifact(out_path)
+    columns = model_info["feature_columns"]
+    X = pd.DataFrame(np.random.default_rng(42).normal(size=(256, len(columns))), columns=columns)
+    diff = np.abs(pipeline.predict_proba(X)[:, 1] - compact.predict_proba(X)[:, 1]).max()
+    print(f"🔍 Max probability difference vs pickle: {diff:.2e}")
@@ -0,0 +1,114 @@
+# src/models/build_cascade.py
+"""
+Build the two-stage cascade (see src/models/cascade.py) for the model the API
+serves.
+
+Features are computed by the API's own feature code (api.batch_features) for
+labelled e-commerce transactions, e.g. Data/merged_data.csv written by
+src/data_input/load&merge.py, so stage 1 sees exactly the served feature
+columns. The served pipeline scores every row, then:
+
+  - half of the rows train stage 1: StandardScaler + LogisticRegression
+  - the other half recalibrate stage-1 probabilities onto the served model's
+    scale and pick the uncertainty band (build_cascade)
+
+The cascade is written to the API's FRAUD_CASCADE_PATH (models/cascade.json).
+The cascade's output distribution on the calibration rows is added to the
+drift reference profile as "cascade_score", the score reference the API
+uses while the cascade is enabled.
+
+Usage (from project root):
+    python src/models/build_cascade.py --data Data/merged_data.csv
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import api  # noqa: E402
+from src.models.cascade import build_cascade  # noqa: E402
+from src.monitoring.drift import save_reference_profile, score_histogram  # noqa: E402
+
+TARGET_COLUMNS = ["class", "Class"]
+# Transaction column -> served LabelEncoder
+ENCODED_COLUMNS = {"source": "source", "browser": "browser", "sex": "sex", "transaction_country": "country"}
+
+
+def load_labelled_transactions(path: str, encoders: dict):
+    """
+    Transaction columns and labels for the rows the served encoders can score
+    """
+    df = pd.read_csv(path)
+    missing = [c for c in api.TRANSACTION_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"{path} lacks transaction column(s) {missing}")
+    target = next(c for c in TARGET_COLUMNS if c in df.columns)
+
+    known = np.ones(len(df), dtype=bool)
+    for col, encoder in ENCODED_COLUMNS.items():
+        known &= df[col].astype(str).isin({str(c) for c in encoders[encoder].classes_}).to_numpy()
+    if not known.all():
+        print(f"⚠️  Skipping {int((~known).sum())} row(s) with labels unknown to the served encoders")
+    df = df[known]
+
+    columns = {}
+    for name in (*api.TRANSACTION_COLUMNS, *api.OPTIONAL_TRANSACTION_COLUMNS):
+        if name in df.columns:
+            kind = {**api.TRANSACTION_COLUMNS, **api.OPTIONAL_TRANSACTION_COLUMNS}[name]
+            columns[name] = df[name].astype(str).tolist() if kind in ("string", "timestamp") else df[name].to_numpy()
+    return columns, df[target].to_numpy(dtype=int)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the API's two-stage cascade for the served model")
+    parser.add_argument("--data", default="Data/merged_data.csv")
+    parser.add_argument("--out", default=api.CASCADE_PATH)
+    parser.add_argument("--profile", default=api.DRIFT_PROFILE_PATH,
+                        help="Drift reference profile to add the cascade score distribution to (if it exists)")
+    parser.add_argument("--max-recall-loss", type=float, default=0.005)
+    parser.add_argument("--max-precision-loss", type=float, default=0.01)
+    args = parser.parse_args()
+
+    if not api.load_model():
+        sys.exit("❌ The served model could not be loaded")
+    feature_columns = list(api.model_info['feature_columns'])
+
+    print(f"🔍 Building served features for {args.data}...")
+    columns, y = load_labelled_transactions(args.data, api.model_info['encoders'])
+    features = api.batch_features(columns, api.model_info['encoders'], update_counts=False)
+    X = api.features_to_matrix(features, feature_columns).to_numpy(dtype=np.float64)
+    p_heavy = api.pipeline.predict_proba(X)[:, 1]
+    print(f"✅ Scored {len(X):,} transactions with the served model")
+
+    X_fit, X_cal, y_fit, y_cal, _, p_cal = train_test_split(X, y, p_heavy, test_size=0.5, random_state=42,
+                                                            stratify=y)
+    scaler = StandardScaler().fit(X_fit)
+    stage_one = LogisticRegression(class_weight="balanced", max_iter=1000).fit(scaler.transform(X_fit), y_fit)
+
+    cascade, cascade_scores = build_cascade(
+        feature_columns, scaler, stage_one, X_cal, p_cal, y_cal, threshold=api.FRAUD_THRESHOLD,
+        max_recall_loss=args.max_recall_loss, max_precision_loss=args.max_precision_loss
+    )
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    cascade.save(args.out)
+    band = cascade.calibration
+    print(f"✅ Saved cascade at {args.out}: band [{band['low']:.4f}, {band['high']:.4f}), "
+          f"stage 1 answers {band['fast_share']:.1%}, recall {band['heavy_recall']:.4f} -> {band['cascade_recall']:.4f}")
+
+    if os.path.exists(args.profile):
+        with open(args.profile) as f:
+            profile = json.load(f)
+        profile["cascade_score"] = score_histogram(cascade_scores)
+        save_reference_profile(profile, args.profile)
+        print(f"✅ Added the cascade score distribution to {args.profile}")
+
+
+if __name__ == "__main__":
+    main()
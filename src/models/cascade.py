@@ -0,0 +1,216 @@
+# src/models/cascade.py
+"""
+Two-stage cascade scoring.
+
+Stage 1 is the LogisticRegression trained in Train.py, evaluated as a single
+dot product (scaler and coefficients stored as plain arrays, no sklearn call).
+Transactions whose stage-1 probability falls inside the uncertainty band
+[low, high) around the fraud threshold are re-scored by the heavy model
+(stage 2); everything else is answered by stage 1:
+
+    p_fast <  low   -> legitimate (stage 1)
+    p_fast >= high  -> fraud      (stage 1)
+    otherwise       -> heavy model decides
+
+Stage 1 is trained with class_weight="balanced" on resampled data, so its raw
+probabilities live on a different scale than the heavy model's. build_cascade()
+recalibrates them (Platt scaling of the stage-1 logit onto the heavy model's
+probabilities, folded into the linear weights), so fraud_probability means
+the same thing whichever stage answered. It then calls calibrate_band(), which
+picks the widest stage-1 coverage such that, on held-out data, recall drops by
+at most max_recall_loss and precision by at most max_precision_loss relative
+to the heavy model alone.
+
+Saved as JSON next to the models: models/cascade.json for the served
+e-commerce model (src/models/build_cascade.py), models/creditcard_cascade.json
+for the credit card models (src/models/Train.py).
+"""
+import json
+from typing import Callable, List, Optional
+
+import numpy as np
+
+DEFAULT_CASCADE_PATH = "models/cascade.json"
+STAGE_FAST = "fast"
+STAGE_FULL = "full"
+
+
+def _recall_precision(y_true, y_pred):
+    tp = np.sum((y_pred == 1) & (y_true == 1))
+    recall = tp / max(np.sum(y_true == 1), 1)
+    precision = tp / max(np.sum(y_pred == 1), 1)
+    return recall, precision
+
+
+def validate_band(low: float, high: float, threshold: float) -> None:
+    """
+    Raise ValueError unless 0 <= low <= threshold <= high: outside that, stage 1
+    would answer rows on the wrong side of the decision threshold
+    """
+    if not (np.isfinite(low) and np.isfinite(high)):
+        raise ValueError(f"cascade band [{low}, {high}) must be finite")
+    if not 0.0 <= low <= threshold <= high:
+        raise ValueError(f"cascade band [{low}, {high}) must satisfy 0 <= low <= {threshold} <= high")
+
+
+def fit_platt(logits, target_probs):
+    """
+    (a, b) such that sigmoid(a * logit + b) best matches target_probs (log loss
+    with the targets as soft labels)
+    """
+    from sklearn.linear_model import LogisticRegression
+
+    logits = np.asarray(logits, dtype=np.float64).reshape(-1, 1)
+    target_probs = np.clip(np.asarray(target_probs, dtype=np.float64), 0.0, 1.0)
+    n = len(target_probs)
+    # Each row appears once as a positive weighted p and once as a negative weighted 1 - p
+    model = LogisticRegression(C=1e6, max_iter=1000).fit(
+        np.vstack([logits, logits]), np.r_[np.ones(n), np.zeros(n)],
+        sample_weight=np.r_[target_probs, 1.0 - target_probs],
+    )
+    return float(model.coef_[0, 0]), float(model.intercept_[0])
+
+
+def cascade_labels(p_fast, heavy_labels, low: float, high: float):
+    return np.where(p_fast < low, 0, np.where(p_fast >= high, 1, heavy_labels))
+
+
+def calibrate_band(p_fast, p_heavy, y_true, threshold: float = 0.2, max_recall_loss: float = 0.005,
+                   max_precision_loss: float = 0.01, grid_size: int = 200) -> dict:
+    """
+    Choose [low, high) on held-out scores; returns the band and its stats
+    """
+    p_fast, p_heavy, y_true = np.asarray(p_fast), np.asarray(p_heavy), np.asarray(y_true)
+    heavy_labels = (p_heavy >= threshold).astype(int)
+    base_recall, base_precision = _recall_precision(y_true, heavy_labels)
+
+    # Candidate cut points: quantiles of the stage-1 scores on each side of the threshold
+    below = p_fast[p_fast < threshold]
+    above = p_fast[p_fast >= threshold]
+    grid = np.linspace(0, 1, grid_size)
+    lows = np.unique(np.concatenate([[0.0], np.quantile(below, grid) if len(below) else []]))
+    highs = np.unique(np.concatenate([[1.0 + 1e-9], np.quantile(above, grid) if len(above) else []]))
+
+    # The lower cut only costs recall (forced negatives), the upper cut only
+    # precision (forced positives). Each side is widened until its bound breaks.
+    low = 0.0
+    for candidate in lows:
+        recall, _ = _recall_precision(y_true, cascade_labels(p_fast, heavy_labels, candidate, 1.0 + 1e-9))
+        if base_recall - recall > max_recall_loss:
+            break
+        low = float(candidate)
+    high = 1.0 + 1e-9
+    for candidate in highs[::-1]:
+        _, precision = _recall_precision(y_true, cascade_labels(p_fast, heavy_labels, low, candidate))
+        if base_precision - precision > max_precision_loss:
+            break
+        high = float(candidate)
+    high = max(high, threshold)
+
+    labels = cascade_labels(p_fast, heavy_labels, low, high)
+    recall, precision = _recall_precision(y_true, labels)
+    return {
+        "low": low,
+        "high": high,
+        "fast_share": float(np.mean((p_fast < low) | (p_fast >= high))),
+        "heavy_recall": float(base_recall),
+        "cascade_recall": float(recall),
+        "heavy_precision": float(base_precision),
+        "cascade_precision": float(precision),
+    }
+
+
+class CascadeModel:
+    def __init__(self, feature_columns: List[str], mean, scale, coef, intercept: float,
+                 low: float, high: float, threshold: float = 0.2, calibration: Optional[dict] = None):
+        self.feature_columns = list(feature_columns)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        # Fold the scaler into the linear model: w.(x - m)/s + b = (w/s).x + (b - w.m/s)
+        self.coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.intercept = float(intercept)
+        self._fold()
+        self.low = low
+        self.high = high
+        self.threshold = threshold
+        self.calibration = calibration or {}
+
+    @classmethod
+    def from_models(cls, feature_columns, scaler, logistic_model, band: dict, threshold: float = 0.2):
+        return cls(feature_columns, scaler.mean_, scaler.scale_, logistic_model.coef_, logistic_model.intercept_[0],
+                   band["low"], band["high"], threshold, calibration=band)
+
+    def _fold(self):
+        self._weights = self.coef / self.scale
+        self._bias = self.intercept - float(np.dot(self.coef, self.mean / self.scale))
+
+    def logit(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self._weights + self._bias
+
+    def fast_proba(self, X) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-self.logit(X)))
+
+    def recalibrate(self, a: float, b: float) -> None:
+        """
+        Apply Platt scaling sigmoid(a * logit + b) by folding it into the weights
+        """
+        if a <= 0:
+            raise ValueError(f"Platt slope must be positive, got {a}: stage 1 does not rank like the heavy model")
+        self.coef = a * self.coef
+        self.intercept = a * self.intercept + b
+        self._fold()
+
+    def in_band(self, p_fast) -> np.ndarray:
+        return (p_fast >= self.low) & (p_fast < self.high)
+
+    def score(self, X, heavy_proba: Callable):
+        """
+        Return (fraud probabilities, stage per row). heavy_proba is called once,
+        with the row indices that need stage 2.
+        """
+        probs = self.fast_proba(X)
+        needs_heavy = self.in_band(probs)
+        stages = np.where(needs_heavy, STAGE_FULL, STAGE_FAST)
+        if needs_heavy.any():
+            probs[needs_heavy] = heavy_proba(np.flatnonzero(needs_heavy))
+        return probs, stages
+
+    def save(self, path: str = DEFAULT_CASCADE_PATH) -> None:
+        with open(path, "w") as f:
+            json.dump({
+                "feature_columns": self.feature_columns,
+                "mean": self.mean.tolist(),
+                "scale": self.scale.tolist(),
+                "coef": self.coef.tolist(),
+                "intercept": self.intercept,
+                "low": self.low,
+                "high": self.high,
+                "threshold": self.threshold,
+                "calibration": self.calibration,
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_CASCADE_PATH) -> "CascadeModel":
+        with open(path) as f:
+            return cls(**json.load(f))
+
+
+def build_cascade(feature_columns, scaler, logistic_model, X_cal, p_heavy, y_cal, threshold: float = 0.2,
+                  max_recall_loss: float = 0.005, max_precision_loss: float = 0.01):
+    """
+    Cascade from a fitted scaler + LogisticRegression (stage 1), calibrated on
+    held-out raw features X_cal with the heavy model's probabilities p_heavy
+    and labels y_cal. Returns (CascadeModel, cascade probabilities on X_cal),
+    the latter being the served score distribution to use as drift reference.
+    """
+    model = CascadeModel.from_models(feature_columns, scaler, logistic_model, {"low": 0.0, "high": 1.0}, threshold)
+    p_heavy = np.asarray(p_heavy, dtype=np.float64)
+    a, b = fit_platt(model.logit(X_cal), p_heavy)
+    model.recalibrate(a, b)
+
+    p_fast = model.fast_proba(X_cal)
+    band = calibrate_band(p_fast, p_heavy, y_cal, threshold=threshold, max_recall_loss=max_recall_loss,
+                          max_precision_loss=max_precision_loss)
+    model.low, model.high = band["low"], band["high"]
+    model.calibration = dict(band, platt=[a, b])
+    return model, np.where(model.in_band(p_fast), p_heavy, p_fast)
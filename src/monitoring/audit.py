@@ -0,0 +1,321 @@
+# src/monitoring/audit.py
+"""
+Asynchronous, batched audit log of scoring decisions.
+
+Request handlers call AuditLogger.log(), which only appends a small tuple to
+an in-memory queue, or log_matrix(), which queues a whole scored batch as one
+entry. Capacity (max_queue) counts rows waiting to be written, not queue
+entries, so large batches count for their size. Neither call blocks: records
+that would take the queue over capacity are dropped and counted. A background
+thread drains the queue and writes batches as Parquet row groups.
+
+Layout, one directory per UTC day:
+
+    <directory>/<YYYY-MM-DD>/audit-<HHMMSS>-<pid>-<seq>.parquet
+
+Files are append-only: a file is written under a .tmp name and renamed once
+closed, on rotation (day change, max rows or rotate interval) or shutdown, so
+readers only ever see complete files. Each record goes to the directory of its
+own timestamp's day. The pid in the name keeps prefork workers from colliding.
+Write errors are counted and logged; the writer thread keeps running.
+
+Columns: timestamp (UTC, us), model_version, threshold, fraud_probability,
+fraud_label, stage ("fast" or "full" cascade stage that produced the
+probability), features (fixed-size float32 list). Feature names are stored in
+the Parquet schema metadata.
+
+Requires pyarrow.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from datetime import date, datetime, timezone
+from glob import glob
+from typing import List, Optional, Union
+
+_STOP = object()
+_MATRIX = object()  # marks a queue entry holding a whole scored batch
+
+
+class AuditLogger:
+    def __init__(self, directory: str, feature_names: List[str], model_version: str,
+                 max_queue: int = 200_000, batch_size: int = 1000, flush_interval: float = 1.0,
+                 max_rows_per_file: int = 1_000_000, rotate_interval: float = 3600.0):
+        import pyarrow as pa  # fail fast when the dependency is missing
+
+        self.directory = directory
+        self.feature_names = list(feature_names)
+        self.model_version = model_version
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_rows_per_file = max_rows_per_file
+        self.rotate_interval = rotate_interval
+
+        self.schema = pa.schema(
+            [
+                ("timestamp", pa.timestamp("us", tz="UTC")),
+                ("model_version", pa.dictionary(pa.int32(), pa.string())),
+                ("threshold", pa.float32()),
+                ("fraud_probability", pa.float32()),
+                ("fraud_label", pa.int8()),
+                ("stage", pa.dictionary(pa.int32(), pa.string())),
+                ("features", pa.list_(pa.float32(), len(self.feature_names))),
+            ],
+            metadata={"feature_names": json.dumps(self.feature_names)},
+        )
+
+        # Capacity is enforced on rows not yet written (_queued_rows), not entries
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = None
+        self._file_path = None
+        self._file_rows = 0
+        self._file_day = None
+        self._file_opened = 0.0
+        self._seq = 0
+
+        # Updated from request threads and the writer thread
+        self._stats_lock = threading.Lock()
+        self._queued_rows = 0
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.files_written = 0
+        self.write_errors = 0
+
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    # ---------- request path ----------
+    def log(self, features, fraud_probability: float, fraud_label: int, threshold: float,
+            stage: str = "full") -> bool:
+        """
+        Enqueue one decision without blocking; returns False if it was dropped
+        """
+        return self._enqueue((time.time(), features, fraud_probability, fraud_label, threshold, stage), 1)
+
+    def log_batch(self, X, fraud_probs, fraud_labels, threshold: float, stages=None) -> int:
+        """
+        Enqueue one record per row of a feature matrix, return the number dropped
+        """
+        dropped = 0
+        stages = ["full"] * len(fraud_probs) if stages is None else stages
+        for row, prob, label, stage in zip(X, fraud_probs, fraud_labels, stages):
+            if not self.log(row, float(prob), int(label), threshold, str(stage)):
+                dropped += 1
+        return dropped
+
+    def log_matrix(self, X, fraud_probs, fraud_labels, threshold: float, stages=None) -> bool:
+        """
+        Enqueue a whole scored batch (2D feature array + 1D arrays) as a single
+        queue entry, so large batches cost one put instead of one per row.
+        All rows are kept or dropped together.
+        """
+        return self._enqueue((_MATRIX, time.time(), X, fraud_probs, fraud_labels, threshold, stages),
+                             len(fraud_probs))
+
+    def _enqueue(self, entry, n_rows: int) -> bool:
+        with self._stats_lock:
+            if self._closed or self._queued_rows + n_rows > self.max_queue:
+                self.dropped += n_rows
+                return False
+            self._queued_rows += n_rows
+            self.enqueued += n_rows
+        self._queue.put_nowait(entry)
+        return True
+
+    def _count(self, **deltas) -> None:
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "queue_depth": self._queued_rows,
+                "queue_capacity": self.max_queue,
+                "files_written": self.files_written,
+                "write_errors": self.write_errors,
+            }
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """
+        Stop accepting records, flush everything queued and finalize the open file
+        """
+        with self._stats_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print("⚠️  Audit writer did not drain the queue in time; records may be lost")
+
+    # ---------- writer thread ----------
+    def _run(self):
+        batch, batch_rows = [], 0
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            stop = item is _STOP
+            if item is not None and not stop:
+                batch.append(item)
+                batch_rows += _n_rows(item)
+
+            try:
+                now = time.monotonic()
+                if batch and (stop or batch_rows >= self.batch_size or now >= deadline):
+                    self._write_batch(batch)
+                    batch = []
+                if now >= deadline:
+                    deadline = now + self.flush_interval
+                    if self._writer is not None and time.time() - self._file_opened >= self.rotate_interval:
+                        self._close_file()
+            except Exception as e:
+                # Never let the thread die: later records would be dropped silently
+                self._count(write_errors=1, dropped=batch_rows)
+                print(f"❌ Audit writer error ({batch_rows} records dropped): {e}")
+                batch = []
+            if not batch and batch_rows:
+                # Rows count against max_queue until written (or dropped)
+                self._count(_queued_rows=-batch_rows)
+                batch_rows = 0
+
+            if stop:
+                self._close_file()
+                return
+
+    def _write_batch(self, batch):
+        import numpy as np
+        import pyarrow as pa
+
+        rows = [r for r in batch if r[0] is not _MATRIX]
+        matrices = [r[1:] for r in batch if r[0] is _MATRIX]
+        n_features = len(self.feature_names)
+        n_records = len(rows) + sum(len(m[2]) for m in matrices)
+
+        try:
+            # Single-row entries first, then each batch entry, as column arrays
+            parts = []
+            if rows:
+                parts.append((
+                    np.array([r[0] for r in rows], dtype=np.float64),
+                    np.asarray([r[1] for r in rows], dtype=np.float32).reshape(len(rows), n_features),
+                    np.array([r[2] for r in rows], dtype=np.float32),
+                    np.array([r[3] for r in rows], dtype=np.int8),
+                    np.array([r[4] for r in rows], dtype=np.float32),
+                    np.array([r[5] for r in rows], dtype=object),
+                ))
+            for ts, X, probs, labels, threshold, stages in matrices:
+                parts.append((
+                    np.full(len(probs), ts, dtype=np.float64),
+                    np.asarray(X, dtype=np.float32).reshape(len(probs), n_features),
+                    np.asarray(probs, dtype=np.float32),
+                    np.asarray(labels, dtype=np.int8),
+                    np.full(len(probs), threshold, dtype=np.float32),
+                    np.full(len(probs), "full", dtype=object) if stages is None else np.asarray(stages, dtype=object),
+                ))
+            timestamps, features, probs, labels, thresholds, stages = (np.concatenate(col) for col in zip(*parts))
+
+            table = pa.Table.from_arrays(
+                [
+                    pa.array((timestamps * 1e6).astype(np.int64), type=pa.timestamp("us", tz="UTC")),
+                    pa.DictionaryArray.from_arrays(np.zeros(n_records, dtype=np.int32), [self.model_version]),
+                    pa.array(thresholds),
+                    pa.array(probs),
+                    pa.array(labels),
+                    pa.array(stages, type=pa.string()).dictionary_encode(),
+                    pa.FixedSizeListArray.from_arrays(pa.array(features.ravel()), n_features),
+                ],
+                schema=self.schema,
+            )
+        except Exception as e:
+            self._count(write_errors=1, dropped=n_records)
+            print(f"❌ Audit log write failed ({n_records} records dropped): {e}")
+            return
+
+        # Each record goes to the file of its own UTC day
+        days = (timestamps // 86400).astype(np.int64)
+        unique_days = np.unique(days)
+        for epoch_day in unique_days:
+            part = table if len(unique_days) == 1 else table.filter(pa.array(days == epoch_day))
+            day = datetime.fromtimestamp(int(epoch_day) * 86400, tz=timezone.utc).date().isoformat()
+            try:
+                if self._writer is not None and (day != self._file_day or self._file_rows >= self.max_rows_per_file):
+                    self._close_file()
+                if self._writer is None:
+                    self._open_file(day)
+                self._writer.write_table(part)
+                self._file_rows += part.num_rows
+                self._count(written=part.num_rows)
+            except Exception as e:
+                self._count(write_errors=1, dropped=part.num_rows)
+                print(f"❌ Audit log write failed ({part.num_rows} records dropped): {e}")
+                # Start a fresh file for the next batch instead of reusing a broken writer
+                self._close_file()
+
+    def _open_file(self, day: str):
+        import pyarrow.parquet as pq
+
+        day_dir = os.path.join(self.directory, day)
+        os.makedirs(day_dir, exist_ok=True)
+        self._seq += 1
+        name = f"audit-{datetime.now(timezone.utc):%H%M%S}-{os.getpid()}-{self._seq:04d}.parquet"
+        self._file_path = os.path.join(day_dir, name)
+        self._writer = pq.ParquetWriter(self._file_path + ".tmp", self.schema, compression="zstd")
+        self._file_day = day
+        self._file_rows = 0
+        self._file_opened = time.time()
+
+    def _close_file(self):
+        if self._writer is None:
+            return
+        writer, path = self._writer, self._file_path
+        self._writer = None
+        try:
+            writer.close()
+            os.replace(path + ".tmp", path)
+            self._count(files_written=1)
+        except Exception as e:
+            self._count(write_errors=1)
+            print(f"❌ Audit log file {path}.tmp could not be finalized: {e}")
+
+
+def _n_rows(entry) -> int:
+    return len(entry[3]) if entry[0] is _MATRIX else 1
+
+
+def read_audit_log(directory: str, day: Union[str, date], expand_features: bool = True):
+    """
+    Load one UTC day of audit records into a DataFrame. With expand_features,
+    the feature vector is unpacked into one column per feature.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    day = day.isoformat() if isinstance(day, date) else day
+    files = sorted(glob(os.path.join(directory, day, "audit-*.parquet")))
+    if not files:
+        return pd.DataFrame()
+
+    table = pa.concat_tables([pq.read_table(f, memory_map=True) for f in files])
+    if not expand_features:
+        return table.to_pandas()
+
+    feature_names = json.loads(table.schema.metadata[b"feature_names"])
+    features = table.column("features").combine_chunks()
+    matrix = features.flatten().to_numpy().reshape(len(table), len(feature_names))
+
+    df = table.drop(["features"]).to_pandas()
+    return pd.concat([df, pd.DataFrame(matrix, columns=feature_names, index=df.index)], axis=1)
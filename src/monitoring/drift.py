@@ -0,0 +1,423 @@
+# src/monitoring/drift.py
+"""
+Streaming data-drift monitor for served traffic.
+
+At training time build_reference_profile() summarizes the training features
+into a small JSON profile:
+  - numerics: quantile bin edges plus the reference count per bin
+  - categoricals: counts for the most frequent reference categories, with
+    everything else pooled into an "other" bucket
+  - the model's fraud score distribution on fixed [0, 1] bins ("score"), and
+    optionally the two-stage cascade's output distribution ("cascade_score")
+
+At serving time DriftMonitor keeps the same fixed-size histograms for the
+live traffic, updated in O(log bins) per feature per transaction, so memory
+is constant whatever the traffic volume. PSI and (binned) KS against the
+reference are computed from the histograms on demand.
+
+The monitor side is pure Python so it adds no import cost to the API.
+Under the prefork server (serve.py) the parent calls share() before forking,
+so all workers update and report the same histograms.
+"""
+import json
+import math
+import threading
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional
+
+PROFILE_VERSION = 1
+DEFAULT_NUM_BINS = 10
+DEFAULT_MAX_CATEGORIES = 50
+SCORE_EDGES = [i / 20 for i in range(1, 20)]  # 20 equal-width buckets on [0, 1]
+SCALAR_BATCH_SIZE = 32  # observe_columns() batches up to this size are updated value by value
+OTHER = "__other__"
+
+# Usual PSI reading: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant shift
+PSI_WARNING = 0.1
+PSI_DRIFT = 0.25
+PSI_EPSILON = 1e-4
+
+
+def psi(expected: List[float], actual: List[float]) -> float:
+    """
+    Population Stability Index between two histograms over the same buckets
+    """
+    e_total, a_total = sum(expected), sum(actual)
+    if not e_total or not a_total:
+        return 0.0
+    value = 0.0
+    for e, a in zip(expected, actual):
+        e_pct = max(e / e_total, PSI_EPSILON)
+        a_pct = max(a / a_total, PSI_EPSILON)
+        value += (a_pct - e_pct) * math.log(a_pct / e_pct)
+    return value
+
+
+def binned_ks(expected: List[float], actual: List[float]) -> float:
+    """
+    Kolmogorov-Smirnov statistic evaluated at the bucket boundaries
+    """
+    e_total, a_total = sum(expected), sum(actual)
+    if not e_total or not a_total:
+        return 0.0
+    e_cum = a_cum = ks = 0.0
+    for e, a in zip(expected, actual):
+        e_cum += e / e_total
+        a_cum += a / a_total
+        ks = max(ks, abs(e_cum - a_cum))
+    return ks
+
+
+def drift_status(psi_value: float) -> str:
+    if psi_value >= PSI_DRIFT:
+        return "drift"
+    if psi_value >= PSI_WARNING:
+        return "warning"
+    return "ok"
+
+
+class NumericSketch:
+    """
+    Fixed-bin histogram: bucket i holds values in [edges[i-1], edges[i])
+    """
+
+    def __init__(self, edges: List[float]):
+        self.edges = list(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self._missing = [0]  # one-element container so it can be moved to shared memory
+
+    @property
+    def missing(self) -> int:
+        return int(self._missing[0])
+
+    def update(self, value) -> None:
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            self._missing[0] += 1
+            return
+        if value != value:  # NaN
+            self._missing[0] += 1
+            return
+        self.counts[bisect_right(self.edges, value)] += 1
+
+
+class CategoricalSketch:
+    """
+    Counts for a fixed set of reference categories plus an "other" bucket.
+    Unseen values are also tracked with a Misra-Gries summary of `capacity`
+    slots, so the most frequent new categories can be reported.
+    """
+
+    def __init__(self, categories: Iterable[str], capacity: int = 20):
+        self.index = {c: i for i, c in enumerate(categories)}
+        self.counts = [0] * (len(self.index) + 1)  # last bucket is "other"
+        self.capacity = capacity
+        self.unseen: Dict[str, int] = {}
+
+    def update(self, value) -> None:
+        if value is None:
+            return
+        value = str(value)
+        i = self.index.get(value)
+        if i is not None:
+            self.counts[i] += 1
+            return
+        self.counts[-1] += 1
+        self.add_unseen(value, 1)
+
+    def add_unseen(self, value: str, count: int) -> None:
+        """
+        Weighted Misra-Gries: bounded memory, heavy hitters among unseen values survive
+        """
+        if value in self.unseen:
+            self.unseen[value] += count
+        elif len(self.unseen) < self.capacity:
+            self.unseen[value] = count
+        else:
+            self.unseen[value] = count
+            floor = min(self.unseen.values())
+            for key in list(self.unseen):
+                self.unseen[key] -= floor
+                if self.unseen[key] <= 0:
+                    del self.unseen[key]
+
+    def top_unseen(self, n: int = 5) -> List[str]:
+        return [k for k, _ in sorted(self.unseen.items(), key=lambda kv: -kv[1])[:n]]
+
+
+class DriftMonitor:
+    """
+    Streaming drift monitor against a reference profile
+    """
+
+    def __init__(self, profile: dict, score_reference: Optional[str] = "score"):
+        """
+        score_reference names the profile histogram the served scores are
+        compared with: "score" for the full model, "cascade_score" when the
+        cascade answers, None (or a name absent from the profile) to skip
+        score drift.
+        """
+        if profile.get("version") != PROFILE_VERSION:
+            raise ValueError(f"Unsupported drift profile version: {profile.get('version')}")
+        self.profile = profile
+        self._lock = threading.Lock()
+        self.shared = False
+        # [n_observed, reset generation]; the generation tells other processes
+        # sharing the counters to clear their own unseen-value summaries
+        self._totals = [0, 0]
+        self._generation = 0
+        self.numeric = {name: NumericSketch(spec["edges"]) for name, spec in self.profile["numeric"].items()}
+        self.categorical = {name: CategoricalSketch(spec["categories"])
+                            for name, spec in self.profile["categorical"].items()}
+        self.score_reference = score_reference if score_reference in self.profile else None
+        self.score = NumericSketch(self.profile[self.score_reference]["edges"]) if self.score_reference else None
+
+    @classmethod
+    def from_file(cls, path: str, score_reference: Optional[str] = "score") -> "DriftMonitor":
+        with open(path) as f:
+            return cls(json.load(f), score_reference)
+
+    @property
+    def n_observed(self) -> int:
+        return int(self._totals[0])
+
+    def _sketches(self):
+        yield from self.numeric.values()
+        yield from self.categorical.values()
+        if self.score is not None:
+            yield self.score
+
+    def share(self) -> None:
+        """
+        Move the counters to memory shared with processes forked afterwards, so
+        every worker updates and reports the same histograms, the counts
+        survive worker recycling and reset() applies to all workers.
+        top_unseen stays per process.
+        """
+        from src.utils.shared import share_copy
+
+        with self._lock:
+            self._totals = share_copy(self._totals, "int64")
+            for sketch in self._sketches():
+                sketch.counts = share_copy(sketch.counts, "int64")
+                if isinstance(sketch, NumericSketch):
+                    sketch._missing = share_copy(sketch._missing, "int64")
+            self.shared = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals[0] = 0
+            self._totals[1] += 1
+            for sketch in self._sketches():
+                sketch.counts[:] = [0] * len(sketch.counts)
+                if isinstance(sketch, NumericSketch):
+                    sketch._missing[0] = 0
+            self._sync_generation()
+
+    def _sync_generation(self) -> None:
+        # Another process sharing the counters reset them: drop local summaries too
+        if self._generation != self._totals[1]:
+            self._generation = int(self._totals[1])
+            for sketch in self.categorical.values():
+                sketch.unseen.clear()
+
+    def observe(self, record: dict, score: Optional[float] = None) -> None:
+        """
+        Update the sketches with one scored transaction; keys not in the
+        profile are ignored
+        """
+        with self._lock:
+            self._sync_generation()
+            self._totals[0] += 1
+            for name, sketch in self.numeric.items():
+                if name in record:
+                    sketch.update(record[name])
+            for name, sketch in self.categorical.items():
+                if name in record:
+                    sketch.update(record[name])
+            if score is not None and self.score is not None:
+                self.score.update(score)
+
+    def observe_columns(self, columns: dict, scores=None) -> None:
+        """
+        Vectorized observe() for a batch given as column arrays (numpy arrays,
+        or pyarrow arrays for categoricals so strings are never materialized).
+        scores may cover only part of the rows (e.g. full-model scores only).
+        """
+        n = len(next(iter(columns.values()))) if columns else len(scores)
+        # Small batches (single-row /predict) take the per-value update: the
+        # numpy/pandas path costs ~1 ms per column regardless of size
+        small = n <= SCALAR_BATCH_SIZE
+        with self._lock:
+            self._sync_generation()
+            self._totals[0] += n
+            for name, sketch in self.numeric.items():
+                if name in columns:
+                    if small:
+                        _add_values(sketch, columns[name])
+                    else:
+                        _add_numeric(sketch, columns[name])
+            for name, sketch in self.categorical.items():
+                if name in columns:
+                    values = columns[name]
+                    if small and not hasattr(values, "type"):  # pyarrow arrays stay vectorized
+                        _add_values(sketch, values)
+                    else:
+                        _add_categorical(sketch, values)
+            if scores is not None and self.score is not None:
+                if small:
+                    _add_values(self.score, scores)
+                else:
+                    _add_numeric(self.score, scores)
+
+    def report(self) -> dict:
+        """
+        PSI/KS per feature and for the score distribution. Features with no
+        served observations (e.g. profile columns the API never receives)
+        get status "no_data" instead of a PSI.
+        """
+        with self._lock:
+            self._sync_generation()
+            features = {}
+            for name, sketch in self.numeric.items():
+                reference = self.profile["numeric"][name]["counts"]
+                counts = [int(c) for c in sketch.counts]
+                n = sum(counts)
+                value = psi(reference, counts) if n else None
+                features[name] = {
+                    "type": "numeric",
+                    "psi": value,
+                    "ks": binned_ks(reference, counts) if n else None,
+                    "n": n,
+                    "missing": sketch.missing,
+                    "status": drift_status(value) if n else "no_data",
+                }
+            for name, sketch in self.categorical.items():
+                spec = self.profile["categorical"][name]
+                reference = spec["counts"] + [spec["other"]]
+                counts = [int(c) for c in sketch.counts]
+                n = sum(counts)
+                value = psi(reference, counts) if n else None
+                features[name] = {
+                    "type": "categorical",
+                    "psi": value,
+                    "n": n,
+                    "unseen_rate": counts[-1] / n if n else 0.0,
+                    "top_unseen": sketch.top_unseen(),
+                    "status": drift_status(value) if n else "no_data",
+                }
+
+            report = {"n_observed": self.n_observed, "shared": self.shared, "features": features}
+            report["score_reference"] = self.score_reference
+            if self.score is not None:
+                reference = self.profile[self.score_reference]["counts"]
+                counts = [int(c) for c in self.score.counts]
+                n = sum(counts)
+                value = psi(reference, counts) if n else None
+                report["score"] = {
+                    "psi": value,
+                    "ks": binned_ks(reference, counts) if n else None,
+                    "n": n,
+                    "status": drift_status(value) if n else "no_data",
+                }
+            report["drifted_features"] = sorted(k for k, v in features.items() if v["status"] == "drift")
+            return report
+
+
+def _add_values(sketch, values) -> None:
+    for value in values:
+        sketch.update(value)
+
+
+def _add_numeric(sketch: NumericSketch, values) -> None:
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    sketch._missing[0] += int(missing.sum())
+    counts = np.bincount(np.searchsorted(sketch.edges, values[~missing], side="right"), minlength=len(sketch.counts))
+    for i, c in enumerate(counts):
+        sketch.counts[i] += int(c)
+
+
+def _add_categorical(sketch: CategoricalSketch, values) -> None:
+    import numpy as np
+
+    categories = list(sketch.index)
+    if hasattr(values, "type"):  # pyarrow array
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        values = pc.cast(values, pa.string()) if pa.types.is_dictionary(values.type) else values
+        values = values.filter(pc.is_valid(values))
+        codes = pc.index_in(values, value_set=pa.array(categories, type=pa.string()))
+        known = codes.drop_null().to_numpy()
+        unseen = pc.value_counts(values.filter(pc.is_null(codes))).to_pylist()
+        unseen = [(u["values"], u["counts"]) for u in unseen]
+    else:
+        import pandas as pd
+
+        values = pd.Series(values).dropna().astype(str)
+        codes = pd.Index(categories).get_indexer(values)  # -1 for unseen values
+        known = codes[codes >= 0]
+        unseen = list(values[codes < 0].value_counts().items())
+
+    counts = np.bincount(known, minlength=len(categories))
+    for i, c in enumerate(counts):
+        sketch.counts[i] += int(c)
+    for value, count in unseen:
+        sketch.counts[-1] += int(count)
+        sketch.add_unseen(str(value), int(count))
+
+
+def build_reference_profile(df, numeric_columns: Iterable[str] = (), categorical_columns: Iterable[str] = (),
+                            scores=None, num_bins: int = DEFAULT_NUM_BINS,
+                            max_categories: int = DEFAULT_MAX_CATEGORIES, cascade_scores=None) -> dict:
+    """
+    Summarize training data (a DataFrame), full-model scores and optionally
+    the cascade's output scores into a drift profile
+    """
+    import numpy as np
+
+    profile = {"version": PROFILE_VERSION, "n_rows": int(len(df)), "numeric": {}, "categorical": {}}
+
+    quantiles = np.linspace(0, 1, num_bins + 1)[1:-1]
+    for col in numeric_columns:
+        values = df[col].to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values)]
+        edges = np.unique(np.quantile(values, quantiles)).tolist() if len(values) else []
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        profile["numeric"][col] = {"edges": edges, "counts": counts.tolist()}
+
+    for col in categorical_columns:
+        value_counts = df[col].dropna().astype(str).value_counts()
+        top = value_counts.iloc[:max_categories]
+        profile["categorical"][col] = {
+            "categories": top.index.tolist(),
+            "counts": [int(c) for c in top.to_numpy()],
+            "other": int(value_counts.iloc[max_categories:].sum()),
+        }
+
+    if scores is not None:
+        profile["score"] = score_histogram(scores)
+    if cascade_scores is not None:
+        profile["cascade_score"] = score_histogram(cascade_scores)
+
+    return profile
+
+
+def score_histogram(scores) -> dict:
+    """
+    Reference histogram of fraud probabilities on SCORE_EDGES
+    """
+    import numpy as np
+
+    scores = np.asarray(scores, dtype=np.float64)
+    counts = np.bincount(np.searchsorted(SCORE_EDGES, scores, side="right"), minlength=len(SCORE_EDGES) + 1)
+    return {"edges": list(SCORE_EDGES), "counts": counts.tolist()}
+
+
+def save_reference_profile(profile: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(profile, f)
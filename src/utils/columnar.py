@@ -0,0 +1,217 @@
+# src/utils/columnar.py
+"""
+Binary columnar payloads for batch scoring.
+
+Two wire formats carry one array per column instead of one object per row:
+
+  Arrow IPC stream   (Content-Type: application/vnd.apache.arrow.stream)
+  msgpack columns    (Content-Type: application/msgpack)
+      a map of column name -> one of
+        {"dtype": "<f8", "data": <bin>}                      numeric, raw little-endian buffer
+        {"type": "utf8", "offsets": <bin int32>, "data": <bin>}  strings, Arrow layout
+        [v0, v1, ...]                                        plain list (convenience, slower)
+
+Both decode to a pyarrow Table with zero-copy views over the request body
+where the layout allows it, and responses are encoded in the request's format.
+Decoded tables are fully validated (offsets, UTF-8, dictionary indices)
+before any compute kernel touches them.
+"""
+from typing import Dict, List
+
+import numpy as np
+import pyarrow as pa
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/msgpack"
+CONTENT_TYPES = (ARROW_STREAM, MSGPACK)
+
+
+class ColumnarPayloadError(ValueError):
+    """
+    Raised for undecodable payloads or columns that fail schema validation
+    """
+
+    def __init__(self, errors):
+        self.errors = [errors] if isinstance(errors, str) else list(errors)
+        super().__init__("; ".join(self.errors))
+
+
+# ---------- decoding ----------
+def _validated(table: pa.Table) -> pa.Table:
+    """
+    Full validation of client-supplied buffers: kernels trust offsets and
+    indices, so a malformed column would read out of bounds
+    """
+    try:
+        table.validate(full=True)
+    except pa.ArrowInvalid as e:
+        raise ColumnarPayloadError(f"Invalid column data: {e}") from None
+    return table
+
+
+def read_arrow_stream(body: bytes) -> pa.Table:
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise ColumnarPayloadError(f"Invalid Arrow IPC stream: {e}") from None
+    return _validated(table)
+
+
+def _msgpack_column(name: str, spec) -> pa.Array:
+    if isinstance(spec, list):
+        return pa.array(spec)
+    if not isinstance(spec, dict):
+        raise ColumnarPayloadError(f"{name}: expected a list or an encoded column map")
+    if spec.get("type") == "utf8":
+        offsets = pa.py_buffer(spec["offsets"])
+        if offsets.size < 4 or offsets.size % 4:
+            raise ColumnarPayloadError(f"{name}: utf8 offsets must hold n + 1 int32 values")
+        return pa.StringArray.from_buffers(offsets.size // 4 - 1, offsets, pa.py_buffer(spec["data"]))
+    if "dtype" in spec:
+        dtype = np.dtype(spec["dtype"])
+        if dtype.kind not in "biuf":
+            raise ColumnarPayloadError(f"{name}: unsupported dtype {spec['dtype']}")
+        return pa.array(np.frombuffer(spec["data"], dtype=dtype))
+    raise ColumnarPayloadError(f"{name}: unrecognized column encoding")
+
+
+def read_msgpack_columns(body: bytes) -> pa.Table:
+    import msgpack
+
+    try:
+        payload = msgpack.unpackb(body, raw=False)
+    except Exception as e:
+        raise ColumnarPayloadError(f"Invalid msgpack payload: {e}") from None
+    if not isinstance(payload, dict):
+        raise ColumnarPayloadError("msgpack payload must be a map of column name -> column")
+
+    columns = {}
+    for name, spec in payload.items():
+        try:
+            columns[name] = _msgpack_column(name, spec)
+        except ColumnarPayloadError:
+            raise
+        except Exception as e:
+            raise ColumnarPayloadError(f"{name}: {e}") from None
+    lengths = {len(col) for col in columns.values()}
+    if len(lengths) > 1:
+        raise ColumnarPayloadError(f"Columns have different lengths: {sorted(lengths)}")
+    return _validated(pa.table(columns))
+
+
+def read_table(body: bytes, content_type: str) -> pa.Table:
+    if content_type == ARROW_STREAM:
+        return read_arrow_stream(body)
+    if content_type == MSGPACK:
+        return read_msgpack_columns(body)
+    raise ColumnarPayloadError(f"Unsupported content type: {content_type}")
+
+
+# ---------- encoding ----------
+def write_arrow_stream(table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _encode_msgpack_column(array: pa.Array):
+    if pa.types.is_dictionary(array.type) or pa.types.is_large_string(array.type):
+        array = as_string_array(array)
+    if pa.types.is_string(array.type):
+        _, offsets, data = array.buffers()
+        n = len(array)
+        return {
+            "type": "utf8",
+            "offsets": offsets.to_pybytes()[array.offset * 4:(array.offset + n + 1) * 4],
+            "data": data.to_pybytes() if data is not None else b"",
+        }
+    values = array.to_numpy(zero_copy_only=False)
+    return {"dtype": values.dtype.str, "data": values.tobytes()}
+
+
+def write_msgpack_columns(table: pa.Table) -> bytes:
+    import msgpack
+
+    return msgpack.packb({name: _encode_msgpack_column(table.column(name).combine_chunks())
+                          for name in table.column_names}, use_bin_type=True)
+
+
+def write_table(table: pa.Table, content_type: str) -> bytes:
+    return write_arrow_stream(table) if content_type == ARROW_STREAM else write_msgpack_columns(table)
+
+
+# ---------- validation ----------
+def _is_text(t: pa.DataType) -> bool:
+    return pa.types.is_string(t) or pa.types.is_large_string(t) or \
+        (pa.types.is_dictionary(t) and (pa.types.is_string(t.value_type) or pa.types.is_large_string(t.value_type)))
+
+
+COLUMN_KINDS = {
+    "integer": pa.types.is_integer,
+    "number": lambda t: pa.types.is_integer(t) or pa.types.is_floating(t),
+    "string": _is_text,
+    "timestamp": lambda t: pa.types.is_timestamp(t) or _is_text(t),
+}
+
+
+def validate_table(table: pa.Table, required: Dict[str, str], optional: Dict[str, str]) -> List[str]:
+    """
+    Column-level checks: presence, type kind and nulls. Returns a list of errors.
+    """
+    errors = []
+    for name, kind in {**required, **optional}.items():
+        if name not in table.column_names:
+            if name in required:
+                errors.append(f"{name}: missing required column")
+            continue
+        column = table.column(name)
+        if not COLUMN_KINDS[kind](column.type):
+            errors.append(f"{name}: expected {kind}, got {column.type}")
+        elif column.null_count:
+            errors.append(f"{name}: {column.null_count} null value(s)")
+    return errors
+
+
+# ---------- vectorized column helpers ----------
+def as_string_array(column) -> pa.Array:
+    array = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    if pa.types.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    if pa.types.is_large_string(array.type):
+        array = array.cast(pa.string())
+    return array
+
+
+_UNIQUE_BLOCK_ROWS = 16384  # presence table of 16384 x 256 bytes
+
+
+def unique_char_counts(array: pa.Array) -> np.ndarray:
+    """
+    Number of distinct characters per string, as len(set(s)). Computed on the
+    raw UTF-8 buffers; rows with multi-byte characters are counted in Python.
+    """
+    array = as_string_array(array)
+    n = len(array)
+    _, offsets_buf, data_buf = array.buffers()
+    offsets = np.frombuffer(offsets_buf, dtype=np.int32)[array.offset:array.offset + n + 1]
+    if n == 0 or offsets[-1] == offsets[0]:
+        return np.zeros(n, dtype=np.int64)
+    data = np.frombuffer(data_buf, dtype=np.uint8)[offsets[0]:offsets[-1]]
+
+    # Mark each (row, byte) pair in a presence table, a block of rows at a time
+    row_ids = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+    counts = np.zeros(n, dtype=np.int64)
+    seen = np.zeros((min(n, _UNIQUE_BLOCK_ROWS), 256), dtype=bool)
+    for start in range(0, n, _UNIQUE_BLOCK_ROWS):
+        stop = min(start + _UNIQUE_BLOCK_ROWS, n)
+        lo, hi = offsets[start] - offsets[0], offsets[stop] - offsets[0]
+        seen[:] = False
+        seen[row_ids[lo:hi] - start, data[lo:hi]] = True
+        counts[start:stop] = seen[:stop - start].sum(axis=1)
+
+    # Bytes >= 0x80 belong to multi-byte characters, where bytes != characters
+    multibyte = np.flatnonzero(np.bincount(row_ids[data >= 0x80], minlength=n))
+    if len(multibyte):
+        counts[multibyte] = [len(set(s)) for s in array.take(pa.array(multibyte)).to_pylist()]
+    return counts
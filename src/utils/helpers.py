@@ -35,4 +35,71 @@ def ip_to_int(ip: str) -> int:
         else:
             return 0
     except:
-        return 0
\ No newline at end of file
+        return 0
+
+
+def ips_to_int(values):
+    """
+    Vectorized IPv4 -> integer for dotted strings or numeric (float-encoded) IPs.
+    Same result as the default path of load&merge.py (float_to_ip then ip_to_int):
+    numbers are truncated, anything outside [0, 2**32) or unparseable maps to 0.
+    pyarrow string arrays are parsed from their buffers, without Python strings.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if hasattr(values, "type"):  # pyarrow
+        import pyarrow as pa
+
+        values = values.combine_chunks() if isinstance(values, pa.ChunkedArray) else values
+        if pa.types.is_dictionary(values.type):
+            values = values.dictionary_decode()
+        if pa.types.is_string(values.type) or pa.types.is_large_string(values.type):
+            return _arrow_ips_to_int(values)
+        values = values.to_numpy(zero_copy_only=False)
+
+    values = pd.Series(values)
+    result = np.zeros(len(values), dtype=np.int64)
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        numbers = values.to_numpy(dtype=np.float64)
+        dotted = np.zeros(len(values), dtype=bool)
+    else:
+        values = values.astype(str).str.strip()
+        octets = values.str.extract(r"^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$")
+        dotted = octets[0].notna().to_numpy()
+        if dotted.any():
+            o = octets[dotted].astype(np.int64).to_numpy()
+            valid = (o <= 255).all(axis=1)
+            result[np.flatnonzero(dotted)[valid]] = (o[valid] << np.array([24, 16, 8, 0])).sum(axis=1)
+        numbers = pd.to_numeric(values.where(~dotted), errors="coerce").to_numpy(dtype=np.float64)
+
+    in_range = ~dotted & np.isfinite(numbers) & (numbers >= 0) & (numbers < 2 ** 32)
+    result[in_range] = numbers[in_range].astype(np.int64)
+    return result.astype(np.uint32)
+
+
+def _arrow_ips_to_int(values):
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    text = pc.utf8_trim_whitespace(values)
+    dotted = pc.fill_null(pc.match_substring_regex(text, r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$"), False)
+    octets = pc.split_pattern(pc.if_else(dotted, text, "0.0.0.0"), ".")
+    o = pc.cast(pc.list_flatten(octets), pa.int64()).to_numpy().reshape(len(values), 4)
+    dotted = dotted.to_numpy(zero_copy_only=False)
+
+    result = np.zeros(len(values), dtype=np.int64)
+    valid = dotted & (o <= 255).all(axis=1)
+    result[valid] = (o[valid] << np.array([24, 16, 8, 0])).sum(axis=1)
+    # Plain decimal numbers (float-encoded IPs) are cast by Arrow, anything
+    # else (signs, exponents, unparseable text) takes the pandas path
+    decimal = pc.fill_null(pc.match_substring_regex(text, r"^\d{1,15}(\.\d*)?$"), False).to_numpy(zero_copy_only=False)
+    decimal &= ~dotted
+    if decimal.any():
+        numbers = pc.cast(text.filter(pa.array(decimal)), pa.float64()).to_numpy()
+        result[decimal] = np.where(numbers < 2 ** 32, numbers, 0).astype(np.int64)
+    rest = np.flatnonzero(~dotted & ~decimal)
+    if len(rest):
+        result[rest] = ips_to_int(text.take(rest).to_numpy(zero_copy_only=False))
+    return result.astype(np.uint32)
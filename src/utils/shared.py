@@ -0,0 +1,36 @@
+# src/utils/shared.py
+"""
+Counters shared between forked worker processes.
+
+Arrays live in an anonymous MAP_SHARED mapping. Allocated in the parent
+before fork (see serve.py), every worker reads and updates the same memory,
+and the counts outlive any single worker (recycling, crashes).
+
+Updates are not atomic across processes: concurrent increments of the same
+cell may occasionally be lost. That is acceptable for monitoring histograms
+and count-min sketches, and avoids a cross-process lock that a killed worker
+could leave held.
+"""
+import mmap
+
+import numpy as np
+
+
+def shared_array(shape, dtype) -> np.ndarray:
+    """
+    Zero-filled array backed by anonymous shared memory
+    """
+    dtype = np.dtype(dtype)
+    size = int(np.prod(shape))
+    buffer = mmap.mmap(-1, max(size * dtype.itemsize, 1))
+    return np.frombuffer(buffer, dtype=dtype, count=size).reshape(shape)
+
+
+def share_copy(values, dtype=None) -> np.ndarray:
+    """
+    Shared-memory copy of an array (or list)
+    """
+    values = np.asarray(values, dtype=dtype)
+    shared = shared_array(values.shape, values.dtype)
+    shared[...] = values
+    return shared
@@ -0,0 +1,113 @@
+import os
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from src.monitoring import audit
+from src.monitoring.audit import _MATRIX, AuditLogger, read_audit_log
+
+
+def test_audit_log_flushes_on_close_and_reads_back(tmp_path):
+    logger = AuditLogger(str(tmp_path), ["purchase_value", "age"], "test-model", batch_size=64)
+    X = np.array([[float(i), 30.0] for i in range(200)], dtype=np.float32)
+    probs = np.linspace(0, 1, 200)
+    logger.log_batch(X[:50], probs[:50], (probs[:50] >= 0.2).astype(int), 0.2)
+    logger.log_matrix(X[50:], probs[50:], (probs[50:] >= 0.2).astype(int), 0.2)
+    logger.close()
+
+    stats = logger.stats()
+    assert stats["written"] == 200 and stats["dropped"] == 0
+    assert not any(name.endswith(".tmp") for _, _, files in os.walk(tmp_path) for name in files)
+
+    df = read_audit_log(str(tmp_path), datetime.now(timezone.utc).date())
+    assert len(df) == 200
+    assert list(df["purchase_value"]) == list(X[:, 0])
+    assert (df["model_version"] == "test-model").all()
+    assert (df["stage"] == "full").all()
+    assert df["fraud_label"].sum() == int((probs >= 0.2).sum())
+
+
+def test_audit_log_drops_instead_of_blocking_when_full(tmp_path):
+    logger = AuditLogger(str(tmp_path), ["x"], "test-model", max_queue=10, flush_interval=60)
+    results = [logger.log([1.0], 0.5, 1, 0.2) for _ in range(10000)]
+    logger.close()
+
+    stats = logger.stats()
+    assert results.count(False) == stats["dropped"]
+    assert stats["written"] + stats["dropped"] == 10000
+    assert logger.log([1.0], 0.5, 1, 0.2) is False
+
+
+def test_queue_capacity_counts_rows_not_batches(tmp_path):
+    logger = AuditLogger(str(tmp_path), ["x"], "test-model", max_queue=100, flush_interval=60, batch_size=10**6)
+    X, probs, labels = np.zeros((60, 1)), np.full(60, 0.5), np.ones(60, dtype=int)
+    assert logger.log_matrix(X, probs, labels, 0.2)
+    # 60 + 60 rows would exceed the capacity of 100 rows
+    assert not logger.log_matrix(X, probs, labels, 0.2)
+    assert logger.log_matrix(X[:40], probs[:40], labels[:40], 0.2)
+    assert not logger.log([1.0], 0.5, 1, 0.2)
+    stats = logger.stats()
+    assert stats["dropped"] == 61 and stats["queue_capacity"] == 100
+    logger.close()
+
+    stats = logger.stats()
+    assert stats["written"] == 100 and stats["queue_depth"] == 0
+
+
+def test_batch_spanning_midnight_is_split_by_day(tmp_path):
+    logger = AuditLogger(str(tmp_path), ["x"], "test-model", flush_interval=60)
+    midnight = datetime(2024, 3, 2, tzinfo=timezone.utc).timestamp()
+    # One queued batch with records on both sides of midnight
+    logger._enqueue((midnight - 1.0, [1.0], 0.5, 1, 0.2, "full"), 1)
+    logger._enqueue((_MATRIX, midnight + 1.0, np.array([[2.0], [3.0]]), np.array([0.1, 0.9]),
+                     np.array([0, 1]), 0.2, None), 2)
+    logger.close()
+
+    before, after = read_audit_log(str(tmp_path), "2024-03-01"), read_audit_log(str(tmp_path), "2024-03-02")
+    assert list(before["x"]) == [1.0]
+    assert list(after["x"]) == [2.0, 3.0]
+    assert logger.stats()["written"] == 3 and logger.stats()["files_written"] == 2
+
+
+def test_writer_survives_finalize_error(tmp_path, monkeypatch):
+    logger = AuditLogger(str(tmp_path), ["x"], "test-model", flush_interval=0.05)
+    real_replace = os.replace
+    calls = []
+
+    def failing_replace(src, dst):
+        calls.append(src)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(audit.os, "replace", failing_replace)
+    yesterday = time.time() - 86400
+    logger._enqueue((yesterday, [1.0], 0.5, 1, 0.2, "full"), 1)
+    while logger.stats()["written"] < 1:
+        time.sleep(0.01)
+    # The day change closes yesterday's file, whose rename fails
+    logger.log([2.0], 0.5, 1, 0.2)
+    while logger.stats()["written"] < 2:
+        time.sleep(0.01)
+    assert logger._thread.is_alive()
+    logger.close()
+
+    stats = logger.stats()
+    assert stats["write_errors"] == 1 and stats["files_written"] == 1
+    assert list(read_audit_log(str(tmp_path), datetime.now(timezone.utc).date())["x"]) == [2.0]
+
+
+def test_audit_log_records_cascade_stage(tmp_path):
+    logger = AuditLogger(str(tmp_path), ["x"], "test-model")
+    logger.log_matrix(np.array([[1.0], [2.0], [3.0]]), np.array([0.01, 0.3, 0.99]), np.array([0, 1, 1]), 0.2,
+                      stages=np.array(["fast", "full", "fast"]))
+    logger.log([4.0], 0.4, 1, 0.2, stage="full")
+    logger.close()
+
+    df = read_audit_log(str(tmp_path), datetime.now(timezone.utc).date())
+    assert dict(zip(df["x"], df["stage"])) == {1.0: "fast", 2.0: "full", 3.0: "fast", 4.0: "full"}
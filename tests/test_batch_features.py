@@ -0,0 +1,82 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("fastapi")
+pytest.importorskip("sklearn")
+
+from sklearn.preprocessing import LabelEncoder
+
+import api
+
+ENCODERS = {
+    "source": LabelEncoder().fit(["Ads", "Direct", "SEO"]),
+    "browser": LabelEncoder().fit(["Chrome", "Safari"]),
+    "sex": LabelEncoder().fit(["F", "M"]),
+    "country": LabelEncoder().fit(["Japan", "Peru"]),
+}
+
+BASE = {"user_id": 1, "purchase_value": 47.0, "device_id": "KIXYSVCHIPQBR", "source": "SEO", "browser": "Chrome",
+        "sex": "M", "age": 30, "ip_address": "43.173.1.96", "transaction_country": "Japan"}
+TIMES = [
+    ("2015-06-28 03:00:34", "2015-08-09 03:57:29"),
+    ("2015-01-01T23:10:00Z", "2015-01-02T00:05:00Z"),
+    ("2015-03-01T10:00:00+02:00", "2015-03-01T23:30:00-05:00"),
+    ("2015-03-01 10:00:00.250+0530", "2015-03-02 01:00:00+01"),
+]
+
+
+def per_row_features(t):
+    """
+    Reference: the original one-transaction-at-a-time computation
+    """
+    signup, purchase = pd.to_datetime(t.signup_time), pd.to_datetime(t.purchase_time)
+    features = {"user_id": t.user_id, "purchase_value": t.purchase_value, "age": t.age}
+    for prefix, ts in (("signup", signup), ("purchase", purchase)):
+        features.update({f"{prefix}_hour": ts.hour, f"{prefix}_day": ts.day,
+                         f"{prefix}_month": ts.month, f"{prefix}_weekday": ts.weekday()})
+    features["time_to_purchase"] = (purchase - signup).total_seconds()
+    features["source_encoded"] = ENCODERS["source"].transform([t.source])[0]
+    features["browser_encoded"] = ENCODERS["browser"].transform([t.browser])[0]
+    features["sex_encoded"] = ENCODERS["sex"].transform([t.sex])[0]
+    features["device_id_length"] = len(t.device_id)
+    features["device_id_unique_chars"] = len(set(t.device_id))
+    features["ip_address_length"] = len(str(t.ip_address))
+    features["country_encoded"] = ENCODERS["country"].transform([t.transaction_country])[0]
+    return features
+
+
+def test_batch_features_match_per_row_computation(monkeypatch):
+    monkeypatch.setattr(api, "frequency_encoder", None)
+    transactions = [api.TransactionData(**dict(BASE, signup_time=s, purchase_time=p,
+                                               device_id=f"ÄB{i}äb", Amount=float(i)))
+                    for i, (s, p) in enumerate(TIMES)]
+
+    expected = pd.DataFrame([per_row_features(t) for t in transactions])
+    features = api.batch_features(api.transaction_columns(transactions), ENCODERS)
+    actual = api.features_to_matrix(features, list(expected.columns) + ["Amount"])
+
+    np.testing.assert_allclose(actual[expected.columns].to_numpy(dtype=float), expected.to_numpy(dtype=float))
+    assert actual["Amount"].tolist() == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_unknown_label_is_rejected(monkeypatch):
+    monkeypatch.setattr(api, "frequency_encoder", None)
+    columns = api.transaction_columns([api.TransactionData(**dict(BASE, browser="Opera", signup_time=TIMES[0][0],
+                                                                  purchase_time=TIMES[0][1]))])
+    with pytest.raises(ValueError):
+        api.batch_features(columns, ENCODERS)
+
+
+def test_small_and_large_batches_parse_timestamps_alike():
+    signup = [s for s, _ in TIMES] + ["2015/03/01 10:00"]
+    purchase = [p for _, p in TIMES] + ["2015-03-02 11:00:00"]
+    repeat = api.SCALAR_BATCH_SIZE // len(signup) + 1
+    small = api.time_features(*api.parse_timestamps(signup), *api.parse_timestamps(purchase))
+    large = api.time_features(*api.parse_timestamps(signup * repeat), *api.parse_timestamps(purchase * repeat))
+    for name, values in small.items():
+        np.testing.assert_allclose(large[name], np.tile(values, repeat), err_msg=name)
+
+    for values in (["2015-03-01 10:00:00 UTC"], ["2015-03-01 10:00:00 UTC"] * (api.SCALAR_BATCH_SIZE + 1)):
+        with pytest.raises(ValueError):
+            api.parse_timestamps(values)
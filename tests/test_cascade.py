@@ -0,0 +1,69 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.models.cascade import CascadeModel, build_cascade, calibrate_band, validate_band
+
+
+def test_calibrated_band_bounds_recall_loss():
+    rng = np.random.default_rng(0)
+    y = (rng.random(20000) < 0.02).astype(int)
+    p_heavy = np.clip(0.7 * y + rng.normal(0.1, 0.1, len(y)), 0, 1)
+    p_fast = np.clip(0.5 * y + rng.normal(0.15, 0.15, len(y)), 0, 1)
+
+    band = calibrate_band(p_fast, p_heavy, y, threshold=0.2, max_recall_loss=0.01, max_precision_loss=0.02)
+    assert band["low"] <= 0.2 <= band["high"]
+    assert band["heavy_recall"] - band["cascade_recall"] <= 0.01
+    assert band["heavy_precision"] - band["cascade_precision"] <= 0.02
+    assert band["fast_share"] > 0.5
+
+
+def test_only_band_rows_reach_heavy_model(tmp_path):
+    cascade = CascadeModel(["a", "b"], mean=[0, 0], scale=[1, 1], coef=[1.0, 0.0], intercept=0.0, low=0.3, high=0.7)
+    X = np.array([[-5.0, 0.0], [0.0, 0.0], [5.0, 0.0]])  # fast probabilities ~0.007, 0.5, ~0.993
+    calls = []
+
+    def heavy(rows):
+        calls.append(list(rows))
+        return np.full(len(rows), 0.9)
+
+    probs, stages = cascade.score(X, heavy)
+    assert calls == [[1]]
+    assert list(stages) == ["fast", "full", "fast"]
+    assert probs[1] == 0.9
+
+    path = str(tmp_path / "cascade.json")
+    cascade.save(path)
+    np.testing.assert_allclose(CascadeModel.load(path).fast_proba(X), cascade.fast_proba(X))
+
+
+def test_band_must_contain_threshold():
+    validate_band(0.05, 0.6, 0.2)
+    validate_band(0.0, 1.0 + 1e-9, 0.2)
+    for low, high in [(0.3, 0.6), (0.05, 0.1), (0.6, 0.05), (-0.1, 0.5), (0.1, float("nan"))]:
+        with pytest.raises(ValueError):
+            validate_band(low, high, 0.2)
+
+
+def test_build_cascade_recalibrates_stage_one_onto_heavy_scale():
+    pytest.importorskip("sklearn")
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(20000, 3))
+    z = 2.0 * X[:, 0] - X[:, 1] - 4.0
+    y = (rng.random(len(X)) < 1.0 / (1.0 + np.exp(-z))).astype(int)
+    p_heavy = 1.0 / (1.0 + np.exp(-z))
+
+    scaler = StandardScaler().fit(X)
+    # Balanced class weights inflate raw stage-1 probabilities
+    stage_one = LogisticRegression(class_weight="balanced").fit(scaler.transform(X), y)
+    raw = stage_one.predict_proba(scaler.transform(X))[:, 1]
+    cascade, served = build_cascade(["a", "b", "c"], scaler, stage_one, X, p_heavy, y, threshold=0.2)
+
+    p_fast = cascade.fast_proba(X)
+    assert abs(p_fast.mean() - p_heavy.mean()) < 0.01 < abs(raw.mean() - p_heavy.mean())
+    validate_band(cascade.low, cascade.high, 0.2)
+    assert len(cascade.calibration["platt"]) == 2
+    np.testing.assert_array_equal(served, np.where(cascade.in_band(p_fast), p_heavy, p_fast))
@@ -0,0 +1,119 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pa = pytest.importorskip("pyarrow")
+msgpack = pytest.importorskip("msgpack")
+
+from src.utils import columnar
+
+ROWS = [
+    {"user_id": 1, "signup_time": "2015-06-28 03:00:34", "purchase_time": "2015-08-09 03:57:29",
+     "purchase_value": 47.0, "device_id": "KIXYSVCHIPQBR", "source": "SEO", "browser": "Chrome", "sex": "M",
+     "age": 30, "ip_address": "43.173.1.96", "transaction_country": "Japan", "Amount": 12.5},
+    {"user_id": 2, "signup_time": "2015-01-01 23:10:00", "purchase_time": "2015-01-02 00:05:00",
+     "purchase_value": 9.0, "device_id": "AAAB", "source": "Ads", "browser": "Safari", "sex": "F",
+     "age": 41, "ip_address": "10.0.0.1", "transaction_country": "Peru", "Amount": 0.0},
+]
+
+
+def rows_to_table(rows):
+    return pa.table({name: [r[name] for r in rows] for name in rows[0]})
+
+
+def test_arrow_and_msgpack_round_trip():
+    table = rows_to_table(ROWS)
+    assert columnar.read_table(columnar.write_table(table, columnar.ARROW_STREAM), columnar.ARROW_STREAM).equals(table)
+    decoded = columnar.read_table(columnar.write_table(table, columnar.MSGPACK), columnar.MSGPACK)
+    assert decoded.equals(table)
+
+    large = table.cast(pa.schema([pa.field(f.name, pa.large_string()) if pa.types.is_string(f.type) else f
+                                  for f in table.schema]))
+    assert columnar.read_table(columnar.write_table(large, columnar.MSGPACK), columnar.MSGPACK).equals(table)
+
+
+def test_msgpack_plain_lists_and_length_mismatch():
+    body = msgpack.packb({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    assert columnar.read_msgpack_columns(body).num_rows == 3
+    with pytest.raises(columnar.ColumnarPayloadError):
+        columnar.read_msgpack_columns(msgpack.packb({"a": [1, 2], "b": ["x"]}))
+    with pytest.raises(columnar.ColumnarPayloadError):
+        columnar.read_table(b"not a payload", columnar.ARROW_STREAM)
+
+
+def test_validate_table_reports_column_errors():
+    table = pa.table({"age": pa.array(["30"]), "user_id": pa.array([None], type=pa.int64())})
+    errors = columnar.validate_table(table, {"age": "integer", "user_id": "integer", "sex": "string"},
+                                     {"Amount": "number"})
+    assert errors == ["age: expected integer, got string", "user_id: 1 null value(s)", "sex: missing required column"]
+
+
+def test_malformed_string_buffers_are_rejected():
+    offsets = np.array([0, 3, 1, 3], dtype=np.int32).tobytes()
+    body = msgpack.packb({"device_id": {"type": "utf8", "offsets": offsets, "data": b"abc"}}, use_bin_type=True)
+    with pytest.raises(columnar.ColumnarPayloadError, match="Invalid column data"):
+        columnar.read_table(body, columnar.MSGPACK)
+
+    past_end = np.array([0, 2, 64], dtype=np.int32).tobytes()
+    body = msgpack.packb({"device_id": {"type": "utf8", "offsets": past_end, "data": b"abc"}}, use_bin_type=True)
+    with pytest.raises(columnar.ColumnarPayloadError):
+        columnar.read_table(body, columnar.MSGPACK)
+
+    bad = pa.StringArray.from_buffers(3, pa.py_buffer(offsets), pa.py_buffer(b"abc"))
+    body = columnar.write_arrow_stream(pa.table({"device_id": bad}))
+    with pytest.raises(columnar.ColumnarPayloadError, match="Invalid column data"):
+        columnar.read_table(body, columnar.ARROW_STREAM)
+
+
+def test_unique_char_counts_matches_python():
+    values = ["KIXYSVCHIPQBR", "", "AAAB", "abcabc", "z", "äbä", "日本日", "ÄäAa", "ab€"]
+    counts = columnar.unique_char_counts(pa.array(values).slice(1))
+    assert counts.tolist() == [len(set(v)) for v in values[1:]]
+    many = values * 4000  # spans several blocks of rows
+    assert columnar.unique_char_counts(pa.array(many)).tolist() == [len(set(v)) for v in many]
+
+
+def test_columnar_features_match_json_path():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("sklearn")
+    from sklearn.preprocessing import LabelEncoder
+    import api
+
+    encoders = {
+        "source": LabelEncoder().fit(["Ads", "Direct", "SEO"]),
+        "browser": LabelEncoder().fit(["Chrome", "Safari"]),
+        "sex": LabelEncoder().fit(["F", "M"]),
+        "country": LabelEncoder().fit(["Japan", "Peru"]),
+    }
+    feature_columns = list(api.transaction_features(api.TransactionData(**ROWS[0]), encoders))
+
+    expected = api.preprocess_transactions([api.TransactionData(**r) for r in ROWS], encoders, feature_columns)
+    features = api.columnar_features(rows_to_table(ROWS), encoders)
+    actual = pd.DataFrame(features).reindex(columns=feature_columns, fill_value=0)
+    np.testing.assert_allclose(actual.to_numpy(dtype=float), expected.to_numpy(dtype=float))
+
+    with pytest.raises(columnar.ColumnarPayloadError, match="unseen"):
+        api.columnar_features(rows_to_table([dict(ROWS[0], browser="Opera")]), encoders)
+
+
+def test_columnar_timestamps_match_json_path():
+    pytest.importorskip("fastapi")
+    import api
+
+    signup = ["2015-06-28 03:00:34", "2015-01-01T23:10:00Z", "2015-03-01T10:00:00+02:00",
+              "2015-03-01 10:00:00.250+0530", "2015/03/01 10:00"]
+    purchase = ["2015-08-09 03:57:29", "2015-01-02T00:05:00Z", "2015-03-01T23:30:00-05:00",
+                "2015-03-02 01:00:00+01", "2015-03-02 11:00:00"]
+    expected = api.time_features(*api.parse_timestamps(signup), *api.parse_timestamps(purchase))
+    actual = api.time_features(*api.columnar_timestamps(pa.chunked_array([signup])),
+                               *api.columnar_timestamps(pa.chunked_array([purchase])))
+    for name, values in expected.items():
+        np.testing.assert_allclose(actual[name], values, err_msg=name)
+
+    # A zone-aware Arrow column gives the same features as the equivalent offset strings
+    tokyo = pa.array(pd.to_datetime(["2015-03-01T10:00:00+09:00"]).tz_convert("Asia/Tokyo"))
+    local, offset = api.columnar_timestamps(pa.chunked_array([tokyo]))
+    assert local.dt.hour.tolist() == [10] and offset.tolist() == [540]
+
+    with pytest.raises(columnar.ColumnarPayloadError, match="Unparseable timestamp"):
+        api.columnar_timestamps(pa.chunked_array([["not a time"]]))
@@ -0,0 +1,125 @@
+import os
+
+import pytest
+
+from src.monitoring.drift import DriftMonitor, CategoricalSketch, psi, binned_ks
+
+PROFILE = {
+    "version": 1,
+    "numeric": {"purchase_value": {"edges": [10.0, 20.0, 30.0], "counts": [25, 25, 25, 25]}},
+    "categorical": {"browser": {"categories": ["Chrome", "Safari"], "counts": [60, 40], "other": 0}},
+    "score": {"edges": [0.5], "counts": [90, 10]},
+}
+
+
+def test_psi_and_ks_zero_for_identical_distributions():
+    assert psi([10, 20, 30], [1, 2, 3]) == pytest.approx(0.0)
+    assert binned_ks([10, 20, 30], [1, 2, 3]) == pytest.approx(0.0)
+
+
+def test_monitor_flags_shifted_traffic():
+    monitor = DriftMonitor(PROFILE)
+    for i in range(1000):
+        monitor.observe({"purchase_value": float(i % 40), "browser": "Chrome" if i % 5 else "Safari"}, 0.1)
+    stable = monitor.report()
+    assert stable["features"]["purchase_value"]["status"] == "ok"
+
+    monitor.reset()
+    for _ in range(1000):
+        monitor.observe({"purchase_value": 100.0, "browser": "Edge"}, 0.9)
+    shifted = monitor.report()
+    assert shifted["n_observed"] == 1000
+    assert shifted["features"]["purchase_value"]["status"] == "drift"
+    assert shifted["features"]["purchase_value"]["ks"] == pytest.approx(0.75)
+    assert shifted["features"]["browser"]["unseen_rate"] == 1.0
+    assert shifted["features"]["browser"]["top_unseen"] == ["Edge"]
+    assert shifted["score"]["status"] == "drift"
+    assert shifted["drifted_features"] == ["browser", "purchase_value"]
+
+
+def test_unseen_categories_use_bounded_memory():
+    sketch = CategoricalSketch(["Chrome"], capacity=5)
+    for i in range(10000):
+        sketch.update(f"device-{i}")
+        sketch.update("NewBrowser")
+    assert len(sketch.unseen) <= 5
+    assert sketch.top_unseen(1) == ["NewBrowser"]
+
+
+def test_features_without_traffic_report_no_data():
+    monitor = DriftMonitor(PROFILE)
+    monitor.observe({"browser": "Chrome"}, 0.1)
+    report = monitor.report()
+    assert report["features"]["purchase_value"]["status"] == "no_data"
+    assert report["features"]["purchase_value"]["psi"] is None
+    assert report["features"]["browser"]["status"] != "no_data"
+    assert "purchase_value" not in report["drifted_features"]
+
+
+def test_scores_compare_against_the_chosen_reference():
+    profile = dict(PROFILE, cascade_score={"edges": [0.5], "counts": [50, 50]})
+    for reference, status in [("score", "drift"), ("cascade_score", "ok")]:
+        monitor = DriftMonitor(profile, score_reference=reference)
+        for i in range(1000):
+            monitor.observe({"browser": "Chrome"}, 0.9 if i % 2 else 0.1)
+        report = monitor.report()
+        assert report["score_reference"] == reference
+        assert report["score"]["status"] == status
+
+    # No reference for the served scores: score drift is skipped
+    for reference in (None, "missing"):
+        monitor = DriftMonitor(profile, score_reference=reference)
+        monitor.observe({"browser": "Chrome"}, 0.9)
+        report = monitor.report()
+        assert report["score_reference"] is None
+        assert "score" not in report
+
+
+def test_small_and_large_batches_update_alike():
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("pandas")
+    values = np.array([5.0, 15.0, np.nan, 35.0, 25.0])
+    browsers = ["Chrome", "Edge", "Safari", "Edge", None]
+    scores = np.array([0.1, 0.9, 0.4, 0.6, 0.2])
+
+    by_value, vectorized = DriftMonitor(PROFILE), DriftMonitor(PROFILE)
+    by_value.observe_columns({"purchase_value": values, "browser": browsers}, scores)
+    n = 20  # one batch of 100 rows, above the per-value threshold
+    vectorized.observe_columns({"purchase_value": np.tile(values, n), "browser": browsers * n}, np.tile(scores, n))
+
+    small, large = by_value.report(), vectorized.report()
+    for name in ("purchase_value", "browser"):
+        assert large["features"][name]["psi"] == pytest.approx(small["features"][name]["psi"])
+    assert large["features"]["purchase_value"]["missing"] == n * small["features"]["purchase_value"]["missing"]
+    assert large["features"]["browser"]["top_unseen"] == small["features"]["browser"]["top_unseen"] == ["Edge"]
+    assert large["score"]["psi"] == pytest.approx(small["score"]["psi"])
+
+
+def in_child(fn):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            fn()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_shared_monitor_aggregates_and_resets_across_processes():
+    pytest.importorskip("numpy")
+    monitor = DriftMonitor(PROFILE)
+    monitor.share()
+    monitor.observe({"purchase_value": 15.0, "browser": "Edge"}, 0.1)
+
+    in_child(lambda: [monitor.observe({"purchase_value": 25.0, "browser": "Chrome"}, 0.9) for _ in range(3)])
+    report = monitor.report()
+    assert report["shared"] and report["n_observed"] == 4
+    assert report["features"]["purchase_value"]["n"] == 4
+    assert report["score"]["n"] == 4
+
+    # A reset from another worker clears the shared counts and local summaries
+    in_child(monitor.reset)
+    report = monitor.report()
+    assert report["n_observed"] == 0
+    assert report["features"]["browser"]["top_unseen"] == []
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+from src.features.frequency_sketch import FrequencySketchEncoder, compare_to_exact
+
+
+def make_frame(n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "device_id": [f"D{i}" for i in rng.zipf(1.3, size=n) % 5000],
+        "browser": rng.choice(["Chrome", "Safari", "Firefox", "IE", "Opera"], size=n),
+    })
+
+
+def test_sketch_never_undercounts_and_respects_error_bound():
+    df = make_frame()
+    encoder = FrequencySketchEncoder(columns=["device_id", "browser"], epsilon=1e-3, delta=1e-3).fit(df)
+
+    for row in compare_to_exact(df, encoder):
+        assert row["max_error"] <= row["error_bound"]
+
+    exact = df["browser"].value_counts()
+    estimate = encoder.transform(df)["browser_freq"]
+    assert (estimate.to_numpy() >= df["browser"].map(exact).to_numpy()).all()
+
+
+def test_sketches_round_trip_and_update_online(tmp_path):
+    df = make_frame(2000)
+    encoder = FrequencySketchEncoder(columns=["device_id", "browser"]).fit(df)
+    path = str(tmp_path / "sketches.npz")
+    encoder.save(path)
+
+    loaded = FrequencySketchEncoder.load(path)
+    pd.testing.assert_frame_equal(loaded.transform(df), encoder.transform(df))
+
+    before = loaded.query({"device_id": "new-device"})["device_id_freq"]
+    after = loaded.update_and_query({"device_id": "new-device"})["device_id_freq"]
+    assert after == before + 1
+
+
+def test_ip_addresses_share_one_key_across_encodings():
+    encoder = FrequencySketchEncoder(columns=["ip_address"]).fit(
+        pd.DataFrame({"ip_address": [732758368.79972, 732758368.2, 350311387.865908]}))
+    assert encoder.query({"ip_address": "43.173.1.96"})["ip_address_freq"] == 2
+    assert encoder.query({"ip_address": "732758368.79972"})["ip_address_freq"] == 2
+
+
+def test_arrow_columns_count_like_python_values():
+    pa = pytest.importorskip("pyarrow")
+    columns = {
+        "device_id": ["D1", "D2", "D1", "D3", "D1"],
+        "ip_address": ["43.173.1.96", " 43.173.1.96", "732758368.79972", "10.0.0.1", "bad"],
+    }
+    arrow = {"device_id": pa.array(columns["device_id"]).dictionary_encode(),
+             "ip_address": pa.chunked_array([columns["ip_address"][:2], columns["ip_address"][2:]])}
+
+    by_value = FrequencySketchEncoder(columns=["device_id", "ip_address"])
+    expected = [by_value.update_and_query({c: v[i] for c, v in columns.items()}) for i in range(5)]
+    encoder = FrequencySketchEncoder(columns=["device_id", "ip_address"])
+    features = encoder.update_and_query_columns(arrow)
+
+    for name in ("device_id_freq", "ip_address_freq"):
+        assert features[name].tolist() == [e[name] for e in expected]
+    assert features["ip_address_freq"].tolist() == [1, 2, 3, 1, 1]
+    for col in columns:
+        np.testing.assert_array_equal(encoder.sketches[col].table, by_value.sketches[col].table)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_shared_sketches_count_updates_from_forked_workers():
+    encoder = FrequencySketchEncoder(columns=["device_id"], epsilon=1e-2)
+    encoder.share()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            encoder.update_and_query_columns({"device_id": ["D1", "D1", "D2"]})
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    assert encoder.query({"device_id": "D1"})["device_id_freq"] == 2
+    assert encoder.sketches["device_id"].total == 3
@@ -0,0 +1,50 @@
+import importlib.util
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+_path = os.path.join(os.path.dirname(__file__), "..", "src", "data_input", "load&merge.py")
+_spec = importlib.util.spec_from_file_location("load_merge", _path)
+load_merge = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(load_merge)
+
+
+def test_compact_credit_data_uses_float32(tmp_path):
+    path = tmp_path / "creditcard.csv"
+    columns = ["Time"] + [f"V{i}" for i in range(1, 29)] + ["Amount", "Class"]
+    pd.DataFrame([[float(i)] * 30 + [i % 2] for i in range(100)], columns=columns).to_csv(path, index=False)
+
+    df = load_merge.load_credit_data(str(path), compact=True)
+    assert (df.drop(columns=["Class"]).dtypes == "float32").all()
+    assert df["Class"].dtype == "int8"
+    assert load_merge.memory_mb(df) < load_merge.default_memory_mb(df)
+
+
+def test_compact_fraud_data_matches_default(tmp_path):
+    path = tmp_path / "Fraud_Data.csv"
+    ips = [732758368.79972, 350311387.865908, 4294967295.9, 4294967296.0, 9876543210.5, 0.4]
+    n = len(ips)
+    pd.DataFrame({
+        "user_id": range(1, n + 1),
+        "signup_time": ["2015-02-24 22:55:49"] * n,
+        "purchase_time": ["2015-04-18 02:47:11"] * n,
+        "purchase_value": [34] * n,
+        "device_id": ["QVPSPJUOCKZAR"] * n,
+        "source": ["SEO", "Ads"] * (n // 2),
+        "browser": ["Chrome"] * n,
+        "sex": ["M", "F"] * (n // 2),
+        "age": [39] * n,
+        "ip_address": ips,
+        "class": [0] * n,
+    }).to_csv(path, index=False)
+
+    compact = load_merge.load_fraud_data(str(path), compact=True)
+    default = load_merge.load_fraud_data(str(path), compact=False)
+    assert "ip_address" not in compact.columns
+    assert compact["ip_int"].dtype == "uint32"
+    assert compact["browser"].dtype == "category"
+    # IPs >= 2**32 are 0.0.0.0 in both modes
+    assert compact["ip_int"].tolist() == default["ip_int"].tolist()
+    assert compact["ip_int"].tolist()[3:5] == [0, 0]
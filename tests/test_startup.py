@@ -0,0 +1,152 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Time-to-first-prediction budget for a fresh API process, in seconds
+STARTUP_TARGET_S = float(os.environ.get("FRAUD_API_STARTUP_TARGET_S", 3.0))
+
+FIRST_PREDICTION_SCRIPT = """
+import json, time
+t0 = time.perf_counter()
+from fastapi.testclient import TestClient
+import api
+with TestClient(api.app) as client:
+    ready = client.get("/ready")
+    encoders = api.model_info["encoders"]
+    response = client.post("/predict", json={
+        "user_id": 1, "signup_time": "2015-06-28 03:00:34", "purchase_time": "2015-08-09 03:57:29",
+        "purchase_value": 47.0, "device_id": "KIXYSVCHIPQBR", "age": 30, "ip_address": "43.173.1.96",
+        "source": str(encoders["source"].classes_[0]), "browser": str(encoders["browser"].classes_[0]),
+        "sex": str(encoders["sex"].classes_[0]), "transaction_country": str(encoders["country"].classes_[0]),
+    })
+t1 = time.perf_counter()
+print(json.dumps({"ready": ready.status_code, "predict": response.status_code,
+                  "first_prediction_s": t1 - t0, **api.startup_timings}))
+"""
+
+
+def test_compact_artifact_matches_pipeline(tmp_path):
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("sklearn")
+    xgb = pytest.importorskip("xgboost")
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+    from src.models.artifact import export_artifact, load_artifact
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(loc=5.0, scale=3.0, size=(500, 6))
+    y = (X[:, 0] + rng.normal(size=500) > 6).astype(int)
+    pipeline = Pipeline([("scaler", StandardScaler()), ("model", xgb.XGBClassifier(n_estimators=20))]).fit(X, y)
+    encoder = LabelEncoder().fit(["Ads", "Direct", "SEO"])
+    model_info = {"feature_columns": [f"f{i}" for i in range(6)], "encoders": {"source": encoder}, "best_auc": 0.9}
+
+    path = export_artifact(pipeline, model_info, str(tmp_path / "model.npz"))
+    compact, info = load_artifact(path)
+
+    np.testing.assert_allclose(compact.predict_proba(X), pipeline.predict_proba(X), atol=1e-6)
+    assert info["feature_columns"] == model_info["feature_columns"]
+    assert list(info["encoders"]["source"].transform(["SEO", "Ads"])) == list(encoder.transform(["SEO", "Ads"]))
+    with pytest.raises(ValueError):
+        info["encoders"]["source"].transform(["Unknown"])
+
+
+def build_tiny_model(tmp_path):
+    """
+    Small XGBoost pipeline over the API's feature columns, plus its model_info
+    """
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("sklearn")
+    xgb = pytest.importorskip("xgboost")
+    pytest.importorskip("fastapi")
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+    import api
+
+    encoders = {
+        "source": LabelEncoder().fit(["Ads", "Direct", "SEO"]),
+        "browser": LabelEncoder().fit(["Chrome", "FireFox", "IE", "Opera", "Safari"]),
+        "sex": LabelEncoder().fit(["F", "M"]),
+        "country": LabelEncoder().fit(["Japan", "United States"]),
+    }
+    sample = api.TransactionData(user_id=1, signup_time="2015-06-28 03:00:34", purchase_time="2015-08-09 03:57:29",
+                                 purchase_value=47.0, device_id="KIXYSVCHIPQBR", source="SEO", browser="Chrome",
+                                 sex="M", age=30, ip_address="43.173.1.96", transaction_country="Japan")
+    feature_columns = list(api.transaction_features(sample, encoders, update_counts=False))
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, len(feature_columns)))
+    y = (X[:, 0] > 0.5).astype(int)
+    pipeline = Pipeline([("scaler", StandardScaler()), ("model", xgb.XGBClassifier(n_estimators=10))]).fit(X, y)
+    model_info = {"feature_columns": feature_columns, "encoders": encoders, "best_model": "XGBoost", "best_auc": 0.9}
+    return pipeline, model_info
+
+
+def isolated_env(tmp_path, **paths):
+    """
+    Environment pointing every model/monitoring path of the API into tmp_path
+    """
+    env = dict(os.environ, FRAUD_AUDIT_DIR="",
+               FRAUD_MODEL_ARTIFACT=str(tmp_path / "model.npz"),
+               FRAUD_MODEL_PIPELINE=str(tmp_path / "pipeline.pkl"),
+               FRAUD_MODEL_INFO=str(tmp_path / "model_info.pkl"),
+               FRAUD_DRIFT_PROFILE=str(tmp_path / "missing_profile.json"),
+               FRAUD_FREQUENCY_SKETCHES=str(tmp_path / "missing_sketches.npz"),
+               FRAUD_CASCADE_PATH=str(tmp_path / "missing_cascade.json"))
+    env.update(paths)
+    return env
+
+
+def test_time_to_first_prediction(tmp_path):
+    pytest.importorskip("httpx")
+    from src.models.artifact import export_artifact
+
+    pipeline, model_info = build_tiny_model(tmp_path)
+    env = isolated_env(tmp_path)
+    export_artifact(pipeline, model_info, env["FRAUD_MODEL_ARTIFACT"])
+
+    result = subprocess.run([sys.executable, "-c", FIRST_PREDICTION_SCRIPT], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+
+    print(f"startup timings: {timings}")
+    assert timings["ready"] == 200
+    assert timings["predict"] == 200
+    assert timings["first_prediction_s"] < STARTUP_TARGET_S
+
+
+def test_newer_pickle_wins_over_stale_artifact(tmp_path, monkeypatch):
+    joblib = pytest.importorskip("joblib")
+    from src.models.artifact import CompactPipeline, export_artifact
+    import api
+
+    pipeline, model_info = build_tiny_model(tmp_path)
+    env = isolated_env(tmp_path)
+    export_artifact(pipeline, model_info, env["FRAUD_MODEL_ARTIFACT"])
+    joblib.dump(pipeline, env["FRAUD_MODEL_PIPELINE"])
+    joblib.dump(model_info, env["FRAUD_MODEL_INFO"])
+
+    for name in ("pipeline", "model_info", "model_version", "model_ready", "drift_monitor",
+                 "frequency_encoder", "cascade"):
+        monkeypatch.setattr(api, name, None)
+    for name, key in (("ARTIFACT_PATH", "FRAUD_MODEL_ARTIFACT"), ("PIPELINE_PATH", "FRAUD_MODEL_PIPELINE"),
+                      ("MODEL_INFO_PATH", "FRAUD_MODEL_INFO"), ("DRIFT_PROFILE_PATH", "FRAUD_DRIFT_PROFILE"),
+                      ("FREQUENCY_SKETCH_PATH", "FRAUD_FREQUENCY_SKETCHES"), ("CASCADE_PATH", "FRAUD_CASCADE_PATH")):
+        monkeypatch.setattr(api, name, env[key])
+
+    # Retrained after the last export: the pickle must be served
+    stat = os.stat(env["FRAUD_MODEL_ARTIFACT"])
+    os.utime(env["FRAUD_MODEL_PIPELINE"], (stat.st_atime, stat.st_mtime + 60))
+    assert api.load_model(warm=False)
+    assert not isinstance(api.pipeline, CompactPipeline)
+
+    # Re-exported: the artifact is preferred again
+    monkeypatch.setattr(api, "pipeline", None)
+    os.utime(env["FRAUD_MODEL_ARTIFACT"], (stat.st_atime, stat.st_mtime + 120))
+    assert api.load_model(warm=False)
+    assert isinstance(api.pipeline, CompactPipeline)
@@ -0,0 +1,64 @@
+import argparse
+import importlib.util
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("joblib")
+
+_path = os.path.join(os.path.dirname(__file__), "..", "src", "models", "Train_OutOfCore.py")
+_spec = importlib.util.spec_from_file_location("train_ooc", _path)
+train_ooc = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(train_ooc)
+
+
+def test_streaming_pass_matches_in_memory_statistics(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 5000
+    df = pd.DataFrame({"Time": rng.uniform(0, 1e5, n), "V1": rng.normal(size=n), "Amount": rng.exponential(80, n)})
+    df["Class"] = (rng.random(n) < 0.02).astype(int)
+    path = tmp_path / "creditcard.csv"
+    df.to_csv(path, index=False)
+
+    data = train_ooc.ChunkedDataset(str(tmp_path)).build(str(path), chunksize=700, test_size=0.2,
+                                                         neg_sample_rate=1.0, seed=42)
+    assert data.rows["train"] + data.rows["test"] == n
+    assert data.class_counts[0] + data.class_counts[1] == data.rows["train"]
+
+    X_train = np.asarray(data.memmap("train", "X"))
+    np.testing.assert_allclose(data.scaler.mean_, X_train.mean(axis=0), rtol=1e-4)
+    chunks = list(data.iter_chunks("train", 1000))
+    assert sum(len(y) for _, y, _ in chunks) == data.rows["train"]
+
+
+@pytest.mark.parametrize("name", ["LogisticRegression", "XGBoost", "LightGBM"])
+def test_every_model_trains_on_tiny_csv(tmp_path, name):
+    if name != "LogisticRegression":
+        pytest.importorskip(name.lower())
+    rng = np.random.default_rng(1)
+    n = 600
+    df = pd.DataFrame({"Time": rng.uniform(0, 1e5, n), "V1": rng.normal(size=n), "Amount": rng.exponential(80, n)})
+    df["Class"] = (df["V1"] + rng.normal(scale=0.5, size=n) > 1.5).astype(int)
+    path = tmp_path / "creditcard.csv"
+    df.to_csv(path, index=False)
+
+    data = train_ooc.ChunkedDataset(str(tmp_path)).build(str(path), chunksize=200, test_size=0.25,
+                                                         neg_sample_rate=0.5, seed=42)
+    model, metrics = train_ooc.train_model(name, data, 200, str(tmp_path))
+    assert metrics["roc_auc"] > 0.8
+
+
+def test_in_memory_baseline_reports_a_dead_child(tmp_path):
+    with pytest.raises(RuntimeError, match="In-memory baseline failed"):
+        train_ooc.run_in_memory_baseline(str(tmp_path / "missing.csv"))
+
+
+def test_neg_sample_rate_must_be_a_fraction():
+    assert train_ooc.sample_rate("0.25") == 0.25
+    assert train_ooc.sample_rate("1") == 1.0
+    for value in ("0", "-0.5", "1.5", "nan", "abc"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            train_ooc.sample_rate(value)